@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
 from app.core.state import lm
@@ -10,16 +12,56 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 # ---------- rename lift ----------
 
 class RenameRequest(BaseModel):
+    # with con_id, lift_id is the controller's index; otherwise the global id
+    con_id: Optional[str] = None
     lift_id: int = Field(ge=0)
     new_name: str = Field(min_length=1, max_length=80)
 
 
+def _global_ids(renames: List[RenameRequest]) -> Dict[int, str]:
+    names: Dict[int, str] = {}
+    unknown: List[str] = []
+
+    for r in renames:
+        if r.con_id is None:
+            names[r.lift_id] = r.new_name
+            continue
+
+        gid = lm.registry.global_id(r.con_id, r.lift_id)
+        if gid is None:
+            unknown.append(f"{r.con_id}/{r.lift_id}")
+        else:
+            names[gid] = r.new_name
+
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown lifts: {', '.join(unknown)}")
+
+    return names
+
+
 @router.post("/lift-rename")
 async def rename_lift_endpoint(payload: RenameRequest):
-    await lm.change_name(payload.lift_id, payload.new_name)
-    logger.info("Renamed lift %d to %s", payload.lift_id, payload.new_name)
+    [(gid, name)] = _global_ids([payload]).items()
+    await lm.change_name(gid, name)
+    logger.info("Renamed lift %d to %s", gid, name)
     return {
         "status": "ok",
         "lift_id": payload.lift_id,
-        "new_name": payload.new_name,
+        "gid": gid,
+        "new_name": name,
+    }
+
+
+class BulkRenameRequest(BaseModel):
+    renames: List[RenameRequest] = Field(min_length=1, max_length=1000)
+
+
+@router.post("/lift-rename/bulk")
+async def bulk_rename_lifts_endpoint(payload: BulkRenameRequest):
+    names = _global_ids(payload.renames)
+    await lm.change_names(names)
+    logger.info("Renamed %d lifts", len(names))
+    return {
+        "status": "ok",
+        "renamed": {str(lift_id): name for lift_id, name in names.items()},
     }
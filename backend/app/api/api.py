@@ -1,17 +1,36 @@
-from fastapi import APIRouter, Response, Header
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Response, Header, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from packaging import version
-from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from app.core.state import lm
+from app.core import config, metrics
+from app.core.state import download_slots, events, firmware, lm, viewers
 from app.core.logging import logger
+from app.managers.broadcast_buffer import sse_event
+from app.utils.snapshot import Snapshot
 
 router = APIRouter(tags=["api"])
 
 
 # ---------- firmware update ----------
 
+class _FirmwareResponse(FileResponse):
+    """FileResponse that frees its download slot once streaming ends."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            download_slots.release()
+            metrics.firmware_downloads.dec()
+
+
+_served = metrics.firmware_requests.labels("served")
+_current = metrics.firmware_requests.labels("current")
+_busy = metrics.firmware_requests.labels("busy")
+_missing = metrics.firmware_requests.labels("missing")
+
+
 @router.get("/update/{con_id}")
 async def update(con_id: str, x_esp8266_version: Optional[str] = Header(default=None)):
     """Serve the latest .bin for a controller if its reported version is older.
@@ -19,36 +38,70 @@ async def update(con_id: str, x_esp8266_version: Optional[str] = Header(default=
     Expects files like:
       app/binaries/<version>.bin           (version discovery)
       app/binaries/<con_id>-<version>.bin  (controller-specific binary to serve)
+
+    Sends x-MD5 for the ESP8266 updater and honours Range requests. When
+    all download slots are taken, answers 503 with Retry-After.
     """
-    bin_dir = Path("app/binaries")
-    versions = [p.stem for p in bin_dir.glob("*.bin")]
-    if not versions:
+    await firmware.refresh()
+
+    latest = firmware.latest_for(con_id)
+    if latest is None:
+        _missing.inc()
         return {"error": "No binaries found on server"}
 
-    # Pick the highest semantic version (by packaging.version)
-    latest = max(versions, key=version.parse)
-
-    if x_esp8266_version is None or version.parse(x_esp8266_version) < version.parse(latest):
-        candidate = bin_dir / f"{con_id}-{latest}.bin"
-        if not candidate.exists():
-            # Fallback: try generic image "<latest>.bin"
-            generic = bin_dir / f"{latest}.bin"
-            if generic.exists():
-                logger.info("Serving GENERIC firmware to %s: %s", con_id, latest)
-                return FileResponse(generic)
+    try:
+        current = version.parse(x_esp8266_version) if x_esp8266_version is not None else None
+    except version.InvalidVersion:
+        current = None
+
+    if current is None or current < latest:
+        image = firmware.lookup(con_id, latest)
+        if image is None:
+            _missing.inc()
             return {"error": f"Binary not found for controller {con_id} and version {latest}"}
 
-        logger.info("Serving firmware to %s: %s", con_id, latest)
-        return FileResponse(candidate)
+        if not download_slots.try_acquire():
+            _busy.inc()
+            return Response(
+                status_code=503,
+                headers={"Retry-After": str(config.FIRMWARE_RETRY_AFTER)},
+            )
+
+        metrics.firmware_downloads.inc()
+        _served.inc()
+
+        logger.info(
+            "Serving %s firmware to %s: %s",
+            "GENERIC" if image.con_id is None else "controller",
+            con_id,
+            latest,
+        )
+        return _FirmwareResponse(
+            image.path,
+            stat_result=image.stat,
+            media_type="application/octet-stream",
+            headers={"ETag": image.etag, "x-MD5": image.md5},
+        )
 
     # Not modified
+    _current.inc()
     return Response(status_code=304)
 
 
 # ---------- Read-only REST APIs ----------
 
+def _snapshot_response(snapshot: Snapshot, if_none_match: Optional[str]) -> Response:
+    """Serve pre-serialized JSON, or 304 if the client already has it."""
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+
+    if snapshot.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=snapshot.data, media_type="application/json", headers=headers)
+
+
 @router.get("/lifts/online")
-async def get_online_lifts() -> Dict[str, Dict[int, Dict[str, object]]]:
+async def get_online_lifts(if_none_match: Optional[str] = Header(default=None)) -> Response:
     """Full map of online lifts per controller.
 
     Returns:
@@ -57,33 +110,22 @@ async def get_online_lifts() -> Dict[str, Dict[int, Dict[str, object]]]:
       "con2": { ... }
     }
     """
-    # Return shallow copies to avoid leaking internal references
-    return {con_id: dict(lifts) for con_id, lifts in lm.online_lifts.items()}
+    return _snapshot_response(lm.lifts_snapshot.get(), if_none_match)
+
+
+@router.get("/lifts/online/flat")
+async def get_online_lifts_flat(if_none_match: Optional[str] = Header(default=None)) -> Response:
+    """Flattened list for easy frontend consumption."""
+    return _snapshot_response(lm.lifts_flat_snapshot.get(), if_none_match)
 
 
 @router.get("/lifts/online/{con_id}")
 async def get_online_lifts_by_controller(con_id: str):
     """Lifts of a specific controller (or 404 if unknown)."""
-    lifts = lm.online_lifts.get(con_id)
+    lifts = lm.lifts_snapshot.get().value.get(con_id)
     if lifts is None:
         return Response(status_code=404)
-    return {"con_id": con_id, "lifts": dict(lifts)}
-
-
-@router.get("/lifts/online/flat")
-async def get_online_lifts_flat() -> List[Dict[str, object]]:
-    """Flattened list for easy frontend consumption."""
-    result: List[Dict[str, object]] = []
-    for con_id, lifts in lm.online_lifts.items():
-        for lift_id, meta in lifts.items():
-            result.append(
-                {
-                    "con_id": con_id,
-                    "lift_id": int(lift_id),
-                    "name": meta.get("name", f"Lift {int(lift_id) + 1}"),
-                }
-            )
-    return result
+    return {"con_id": con_id, "lifts": lifts}
 
 
 @router.get("/lifts/active")
@@ -93,12 +135,187 @@ async def get_active_lifts() -> Dict[str, int]:
 
 
 @router.get("/power")
-async def get_power_states() -> Dict[str, int]:
+async def get_power_states(if_none_match: Optional[str] = Header(default=None)) -> Response:
     """All known power states by controller (0/1)."""
-    return dict(lm.lift_power)
+    return _snapshot_response(lm.power_snapshot.get(), if_none_match)
 
 
 @router.get("/power/{con_id}")
 async def get_power_state(con_id: str):
     """Power state of a single controller, or null if unknown."""
-    return {"con_id": con_id, "state": lm.lift_power.get(con_id)}
\ No newline at end of file
+    return {"con_id": con_id, "state": lm.power_snapshot.get().value.get(con_id)}
+
+
+# ---------- read-only stream ----------
+
+# comment line sent to idle viewers, so dead connections are noticed
+_KEEPALIVE = b": keepalive\n\n"
+_KEEPALIVE_SECONDS = 15.0
+
+
+def _snapshot_events(seq: int) -> bytes:
+    """Online lifts and power states, as events with id `seq`."""
+    return sse_event(seq, lm.lifts_message.get().frame) + sse_event(seq, lm.power_message.get().frame)
+
+
+def _parse_seq(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+async def _sse(seq: Optional[int]) -> AsyncIterator[bytes]:
+    metrics.stream_viewers.inc()
+
+    try:
+        backlog = viewers.since(seq) if seq is not None else None
+
+        while True:
+            if backlog is None:
+                # first connect, or fell out of the buffer: start over
+                seq = viewers.seq
+                yield _snapshot_events(seq)
+
+            elif backlog:
+                seq += len(backlog)
+                yield b"".join(event for _, event in backlog)
+
+            else:
+                yield _KEEPALIVE
+
+            if viewers.seq == seq:
+                await viewers.wait(_KEEPALIVE_SECONDS)
+
+            backlog = viewers.since(seq)
+
+    finally:
+        metrics.stream_viewers.dec()
+
+
+@router.get("/stream")
+async def stream(last_event_id: Optional[str] = Header(default=None)):
+    """Read-only Server-Sent Events feed of everything clients are sent.
+
+    Starts with the online_lifts and power_states messages, then streams
+    deltas, lift_moved, power_state, stop, ... as `data:` lines. Browsers
+    reconnect with `Last-Event-ID` and continue where they left off, as
+    long as the events are still buffered. Viewers never count as clients.
+    """
+    return StreamingResponse(
+        _sse(_parse_seq(last_event_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stream/poll")
+async def poll_stream(
+    after: Optional[int] = None,
+    timeout: float = Query(default=25.0, ge=0, le=60),
+) -> Response:
+    """Long-poll variant of /stream for scripts.
+
+    Waits up to `timeout` seconds for events after `after` and returns
+    {"seq": 42, "events": [...]}; pass `seq` as `after` next time. Without
+    `after`, or if it is no longer buffered, "snapshot" holds the current
+    online lifts and power states instead.
+    """
+    metrics.stream_viewers.inc()
+
+    try:
+        backlog = viewers.since(after) if after is not None else None
+
+        if backlog == [] and timeout > 0:
+            await viewers.wait(timeout)
+            backlog = viewers.since(after)
+
+    finally:
+        metrics.stream_viewers.dec()
+
+    if backlog is None:
+        body = b'{"seq":%d,"snapshot":[%s,%s],"events":[]}' % (
+            viewers.seq,
+            lm.lifts_message.get().frame.data,
+            lm.power_message.get().frame.data,
+        )
+    else:
+        body = b'{"seq":%d,"events":[%s]}' % (
+            after + len(backlog),
+            b",".join(frame.data for frame, _ in backlog),
+        )
+
+    return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-cache"})
+
+
+# ---------- emergency stop ----------
+
+@router.get("/estop/last")
+async def get_last_estop():
+    """Timing of the last emergency stop.
+
+    Returns:
+    {
+      "at": 1760000000.0,                  # unix time
+      "send_ms": {"con1": 0.4, "con2": null},  # null = missed the deadline
+      "ack_ms": {"con1": 38.2}             # end-to-end, confirmed by controller
+    }
+    """
+    return lm.last_stop or {}
+
+
+# ---------- history ----------
+
+async def _history(
+    con_id: Optional[str],
+    lift_id: Optional[int],
+    since: Optional[float],
+    until: Optional[float],
+    kind: Optional[str],
+    limit: int,
+) -> List[Dict[str, Any]]:
+    if events is None:
+        return []
+    return await events.query(con_id, lift_id, since, until, kind, limit)
+
+
+@router.get("/history")
+async def get_history(
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(default=500, ge=1, le=10000),
+):
+    """Recorded events of all controllers, newest first.
+
+    `since`/`until` are unix times, `kind` is one of move, move_failed,
+    moved, power, online, offline, estop, rename. Each event looks like:
+    {"ts": 1760000000.0, "kind": "move", "con_id": "con1", "lift_id": 0,
+     "client_id": "cli1", "toggle": 1, "direction": 1}
+    """
+    return await _history(None, None, since, until, kind, limit)
+
+
+@router.get("/history/{con_id}")
+async def get_controller_history(
+    con_id: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(default=500, ge=1, le=10000),
+):
+    """Recorded events of one controller, newest first."""
+    return await _history(con_id, None, since, until, kind, limit)
+
+
+@router.get("/history/{con_id}/{lift_id}")
+async def get_lift_history(
+    con_id: str,
+    lift_id: int,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(default=500, ge=1, le=10000),
+):
+    """Recorded events of one lift, newest first."""
+    return await _history(con_id, lift_id, since, until, kind, limit)
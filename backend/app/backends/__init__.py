@@ -0,0 +1,18 @@
+from app.backends.base import Backend, EventHandler
+from app.backends.memory_backend import MemoryBackend
+
+
+def create_backend(url: str = "") -> Backend:
+    """Backend for `url`: empty for in-process, redis:// or rediss:// for Redis."""
+    if not url:
+        return MemoryBackend()
+
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        from app.backends.redis_backend import RedisBackend
+
+        return RedisBackend.from_url(url)
+
+    raise ValueError(f"Unsupported backend URL: {url}")
+
+
+__all__ = ["Backend", "EventHandler", "MemoryBackend", "create_backend"]
@@ -0,0 +1,38 @@
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+EventHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class Backend(ABC):
+    """Shares lift state and events between backend workers.
+
+    Every worker applies its own events locally and publishes them; the
+    backend delivers them to all *other* workers, tagged with the
+    publishing worker's id as "origin". Controller state is kept in a
+    shared store so a worker that starts later can catch up.
+    """
+
+    def __init__(self) -> None:
+        self.worker_id = uuid.uuid4().hex[:12]
+
+    @abstractmethod
+    async def start(self, on_event: EventHandler) -> None:
+        """Start delivering events of other workers to `on_event`."""
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Stop delivering events and release connections."""
+
+    @abstractmethod
+    async def publish(self, event: Dict[str, Any]) -> None:
+        """Send `event` to every other worker."""
+
+    @abstractmethod
+    async def save_controller(self, con_id: str, state: Optional[Dict[str, Any]]) -> None:
+        """Store (or with None, delete) the shared state of a controller."""
+
+    @abstractmethod
+    async def load_controllers(self) -> Dict[str, Dict[str, Any]]:
+        """All stored controller states by con_id."""
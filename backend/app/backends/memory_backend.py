@@ -0,0 +1,29 @@
+from typing import Any, Dict, Optional
+
+from app.backends.base import Backend, EventHandler
+
+
+class MemoryBackend(Backend):
+    """Single-process backend: there are no other workers to notify."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._controllers: Dict[str, Dict[str, Any]] = {}
+
+    async def start(self, on_event: EventHandler) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        pass
+
+    async def save_controller(self, con_id: str, state: Optional[Dict[str, Any]]) -> None:
+        if state is None:
+            self._controllers.pop(con_id, None)
+        else:
+            self._controllers[con_id] = state
+
+    async def load_controllers(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self._controllers)
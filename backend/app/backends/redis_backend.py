@@ -0,0 +1,85 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+from app.backends.base import Backend, EventHandler
+from app.core.logging import logger
+from app.utils.frames import dumps, loads
+
+
+class RedisBackend(Backend):
+    """Backend on Redis pub/sub plus a hash for controller state.
+
+    Works with any client exposing the `redis.asyncio` API (publish,
+    pubsub, hset, hdel, hgetall), so a local fake can stand in for tests.
+    """
+
+    def __init__(self, client: Any, prefix: str = "smartlift") -> None:
+        super().__init__()
+        self.client = client
+        self.channel = f"{prefix}:events"
+        self.state_key = f"{prefix}:controllers"
+
+        self._pubsub: Any = None
+        self._reader: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "smartlift") -> "RedisBackend":
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as exc:
+            raise RuntimeError("Redis backend requires the 'redis' package") from exc
+
+        return cls(aioredis.from_url(url), prefix)
+
+    async def start(self, on_event: EventHandler) -> None:
+        self._pubsub = self.client.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._reader = asyncio.create_task(self._read(on_event))
+
+        logger.info("Redis backend started as worker %s", self.worker_id)
+
+    async def _read(self, on_event: EventHandler) -> None:
+        async for message in self._pubsub.listen():
+            if message.get("type") != "message":
+                continue
+
+            try:
+                event = loads(message["data"])
+            except Exception as exc:
+                logger.error("Dropping malformed backend event: %s", exc)
+                continue
+
+            if event.get("origin") == self.worker_id:
+                continue
+
+            try:
+                await on_event(event)
+            except Exception:
+                logger.exception("Failed to apply backend event %s", event.get("t"))
+
+    async def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self.channel)
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def publish(self, event: Dict[str, Any]) -> None:
+        await self.client.publish(self.channel, dumps({**event, "origin": self.worker_id}))
+
+    async def save_controller(self, con_id: str, state: Optional[Dict[str, Any]]) -> None:
+        if state is None:
+            await self.client.hdel(self.state_key, con_id)
+        else:
+            await self.client.hset(self.state_key, con_id, dumps(state))
+
+    async def load_controllers(self) -> Dict[str, Dict[str, Any]]:
+        raw = await self.client.hgetall(self.state_key)
+
+        return {
+            (k.decode() if isinstance(k, bytes) else k): loads(v)
+            for k, v in raw.items()
+        }
@@ -0,0 +1,139 @@
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.getenv(name, default).strip().lower()
+
+
+# ---------- outbound WebSocket queues ----------
+
+# Max. number of frames buffered per connection before the slow consumer
+# policy kicks in.
+SEND_QUEUE_SIZE = _env_int("SMARTLIFT_SEND_QUEUE_SIZE", 256)
+
+# What to do with a connection whose queue is full:
+#   drop_oldest | coalesce | disconnect
+SLOW_CONSUMER_POLICY = _env_str("SMARTLIFT_SLOW_CONSUMER_POLICY", "coalesce")
+
+# Max. queued frames a client sends out as one JSON array, for clients that
+# negotiated the smartlift.batch.v1 subprotocol. 0 or 1 disables batching.
+WS_BATCH_MAX = _env_int("SMARTLIFT_WS_BATCH_MAX", 32)
+
+
+# ---------- read-only viewers ----------
+
+# Recent client broadcasts kept for /api/stream viewers; a viewer that falls
+# further behind, or reconnects later, gets fresh snapshots.
+STREAM_BUFFER_SIZE = _env_int("SMARTLIFT_STREAM_BUFFER_SIZE", 1024)
+
+
+# ---------- client compression (permessage-deflate) ----------
+
+# Only used with `--ws app.websocket.protocol:WebSocketProtocol`; controller
+# links are never compressed. Level 0 disables compression.
+WS_DEFLATE_LEVEL = _env_int("SMARTLIFT_WS_DEFLATE_LEVEL", 6)
+
+# LZ77 window of both directions, 9..15. The compressor of one connection
+# needs about 2 ** (bits + 2) + 2 ** (mem_level + 9) bytes: 32 KiB with the
+# defaults, against 256 KiB for zlib's own defaults.
+WS_DEFLATE_WINDOW_BITS = _env_int("SMARTLIFT_WS_DEFLATE_WINDOW_BITS", 12)
+
+# zlib memLevel, 1..9: memory vs speed of the compressor.
+WS_DEFLATE_MEM_LEVEL = _env_int("SMARTLIFT_WS_DEFLATE_MEM_LEVEL", 5)
+
+
+# ---------- lift_moved telemetry ----------
+
+# Max. lift_moved frames per second and lift forwarded to clients; frames in
+# between are coalesced to the latest one. 0 forwards everything.
+LIFT_MOVED_RATE_HZ = _env_float("SMARTLIFT_LIFT_MOVED_RATE_HZ", 20.0)
+
+
+# ---------- controller heartbeats ----------
+
+# A controller that sent nothing for this many seconds gets a ping.
+# 0 disables heartbeats.
+HEARTBEAT_INTERVAL = _env_float("SMARTLIFT_HEARTBEAT_INTERVAL", 10.0)
+
+# Seconds to wait for any frame after a ping before the controller is
+# disconnected and its lifts go offline.
+HEARTBEAT_TIMEOUT = _env_float("SMARTLIFT_HEARTBEAT_TIMEOUT", 5.0)
+
+
+# ---------- controller reconnects ----------
+
+# Seconds a disconnected controller's lifts stay online. A hello from the
+# same controller within this window, with the same lifts, is invisible to
+# clients; a changed lift set reaches them as one update. The ESP retries
+# every 5 s. 0 takes lifts offline at once.
+RECONNECT_GRACE = _env_float("SMARTLIFT_RECONNECT_GRACE", 10.0)
+
+
+# ---------- client sessions ----------
+
+# Seconds a dropped client's session is kept. Reconnecting within it, the
+# client gets the messages it missed instead of fresh snapshots, and other
+# clients see no disconnect. 0 disables sessions.
+CLIENT_RESUME_GRACE = _env_float("SMARTLIFT_CLIENT_RESUME_GRACE", 10.0)
+
+# Sent messages kept per session for replay; a client further behind gets
+# snapshots instead.
+CLIENT_REPLAY_SIZE = _env_int("SMARTLIFT_CLIENT_REPLAY_SIZE", 256)
+
+
+# ---------- move commands ----------
+
+# How long a controller has to answer move_lift with lift_moved before the
+# issuing client is told the command failed. 0 disables tracking.
+MOVE_ACK_TIMEOUT_MS = _env_int("SMARTLIFT_MOVE_ACK_TIMEOUT_MS", 1000)
+
+
+# ---------- emergency stop ----------
+
+# Per-controller deadline for delivering STOP; controllers that miss it are
+# disconnected, which puts the ESP's relays into their safe state.
+ESTOP_DEADLINE_MS = _env_int("SMARTLIFT_ESTOP_DEADLINE_MS", 500)
+
+
+# ---------- persistence ----------
+
+# Seconds to wait after a lift rename before lift_info.json is rewritten;
+# renames in between are written together.
+LIFT_INFO_WRITE_DELAY = _env_float("SMARTLIFT_LIFT_INFO_WRITE_DELAY", 0.5)
+
+# SQLite file for the move/power/e-stop history; empty disables it.
+EVENT_DB_PATH = os.getenv("SMARTLIFT_EVENT_DB_PATH", "app/data/events.db").strip()
+
+# Days of history to keep, 0 keeps everything.
+EVENT_RETENTION_DAYS = _env_float("SMARTLIFT_EVENT_RETENTION_DAYS", 90.0)
+
+
+# ---------- firmware updates ----------
+
+# Max. firmware images streamed at the same time; further controllers get
+# 503 with Retry-After and try again later. 0 disables the limit.
+FIRMWARE_MAX_DOWNLOADS = _env_int("SMARTLIFT_FIRMWARE_MAX_DOWNLOADS", 4)
+
+# Seconds a controller is asked to wait when all download slots are taken.
+FIRMWARE_RETRY_AFTER = _env_int("SMARTLIFT_FIRMWARE_RETRY_AFTER", 30)
+
+
+# ---------- scale-out ----------
+
+# Shared state and pub/sub between workers: empty for a single process,
+# or a redis:// URL to run several workers or nodes.
+BACKEND_URL = os.getenv("SMARTLIFT_BACKEND_URL", "").strip()
@@ -0,0 +1,222 @@
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.models.messages import Case
+
+NAMESPACE = "smartlift"
+
+
+# ---------- outbound WebSocket queues ----------
+
+# Queue gauges are computed at scrape time (see `bind_connection_manager`)
+# so the enqueue path never touches a metric.
+send_queue_messages = Gauge(
+    "ws_send_queue_messages",
+    "Frames currently waiting in outbound WebSocket queues",
+    namespace=NAMESPACE,
+)
+
+send_queue_max_depth = Gauge(
+    "ws_send_queue_max_depth",
+    "Deepest outbound WebSocket queue",
+    namespace=NAMESPACE,
+)
+
+send_queue_overflow = Counter(
+    "ws_send_queue_overflow",
+    "Frames dropped, merged or connections closed because a queue was full",
+    ["policy"],
+    namespace=NAMESPACE,
+)
+
+
+send_failures = Counter(
+    "ws_send_failures",
+    "Sends that raised, by path (queued writer, urgent direct send)",
+    ["path"],
+    namespace=NAMESPACE,
+)
+
+
+# ---------- WebSocket control loop ----------
+
+# Observed on every inbound frame: children are bound once (see
+# `per_case`) and the buckets are sized for microsecond work.
+_FAST_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.1,
+)
+
+ws_parse_seconds = Histogram(
+    "ws_parse_seconds",
+    "Time to decode and validate an inbound frame",
+    ["peer"],
+    namespace=NAMESPACE,
+    buckets=_FAST_BUCKETS,
+)
+
+ws_handler_seconds = Histogram(
+    "ws_handler_seconds",
+    "Time spent in the handler of an inbound frame",
+    ["peer", "case"],
+    namespace=NAMESPACE,
+    buckets=_FAST_BUCKETS,
+)
+
+lock_wait_seconds = Histogram(
+    "lock_wait_seconds",
+    "Time spent waiting for a lock (controller state, connection table)",
+    ["lock"],
+    namespace=NAMESPACE,
+    buckets=_FAST_BUCKETS,
+)
+
+broadcast_seconds = Histogram(
+    "broadcast_seconds",
+    "Time to queue one broadcast for every recipient",
+    ["target"],
+    namespace=NAMESPACE,
+    buckets=_FAST_BUCKETS,
+)
+
+# Computed at scrape time, see `bind_connection_manager` / `bind_lift_manager`
+connected_controllers = Gauge(
+    "connected_controllers",
+    "Controllers connected to this process",
+    namespace=NAMESPACE,
+)
+
+connected_clients = Gauge(
+    "connected_clients",
+    "Clients connected to this process",
+    namespace=NAMESPACE,
+)
+
+stream_viewers = Gauge(
+    "stream_viewers",
+    "Read-only viewers on /stream (Server-Sent Events and long polls)",
+    namespace=NAMESPACE,
+)
+
+online_lifts = Gauge(
+    "online_lifts",
+    "Lifts reported by online controllers",
+    namespace=NAMESPACE,
+)
+
+
+def per_case(histogram: Histogram, peer: str) -> Dict[str, Histogram]:
+    """Children of `histogram` for `peer`, bound once per case."""
+    return {case.value: histogram.labels(peer, case.value) for case in Case}
+
+
+# ---------- lift_moved telemetry ----------
+
+lift_moved_frames = Counter(
+    "lift_moved_frames",
+    "lift_moved frames by coalescer outcome "
+    "(forwarded, bypassed, merged into a newer frame, dropped for a transition)",
+    ["outcome"],
+    namespace=NAMESPACE,
+)
+
+
+# ---------- controller connections ----------
+
+controller_reconnects = Counter(
+    "controller_reconnects",
+    "Controller disconnects by outcome of the reconnect grace window "
+    "(resumed, expired)",
+    ["outcome"],
+    namespace=NAMESPACE,
+)
+
+
+# ---------- move commands ----------
+
+move_ack_seconds = Histogram(
+    "move_ack_seconds",
+    "Time from sending move_lift to a controller until its lift_moved reply",
+    namespace=NAMESPACE,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+move_commands = Counter(
+    "move_commands",
+    "Tracked move_lift commands by outcome (acked, timeout, offline)",
+    ["outcome"],
+    namespace=NAMESPACE,
+)
+
+move_commands_rejected = Counter(
+    "move_commands_rejected",
+    "move_lift commands refused before reaching a controller "
+    "(offline, unknown_lift, unroutable)",
+    ["reason"],
+    namespace=NAMESPACE,
+)
+
+
+# ---------- emergency stop ----------
+
+_STOP_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+estop_send_seconds = Histogram(
+    "estop_send_seconds",
+    "Time to hand STOP to a controller socket",
+    namespace=NAMESPACE,
+    buckets=_STOP_BUCKETS,
+)
+
+estop_ack_seconds = Histogram(
+    "estop_ack_seconds",
+    "End-to-end time from e-stop until a controller confirmed it",
+    namespace=NAMESPACE,
+    buckets=_STOP_BUCKETS,
+)
+
+estop_deadline_missed = Counter(
+    "estop_deadline_missed",
+    "Controllers that did not take STOP within the deadline",
+    namespace=NAMESPACE,
+)
+
+
+# ---------- firmware updates ----------
+
+firmware_downloads = Gauge(
+    "firmware_downloads",
+    "Firmware images currently being streamed",
+    namespace=NAMESPACE,
+)
+
+firmware_requests = Counter(
+    "firmware_requests",
+    "Firmware update checks by outcome (served, current, busy, missing)",
+    ["outcome"],
+    namespace=NAMESPACE,
+)
+
+
+# ---------- event history ----------
+
+events_recorded = Counter(
+    "events_recorded",
+    "History events written to the event store or dropped",
+    ["outcome"],
+    namespace=NAMESPACE,
+)
+
+
+def bind_connection_manager(cm) -> None:
+    """Report queue gauges from `cm` whenever metrics are scraped."""
+    send_queue_messages.set_function(lambda: sum(cm.queue_depths().values()))
+    send_queue_max_depth.set_function(lambda: max(cm.queue_depths().values(), default=0))
+    connected_controllers.set_function(lambda: cm.count("con"))
+    connected_clients.set_function(lambda: cm.count("cli"))
+
+
+def bind_lift_manager(lm) -> None:
+    """Report lift gauges from `lm` whenever metrics are scraped."""
+    online_lifts.set_function(lambda: sum(len(lifts) for lifts in lm.online_lifts.values()))
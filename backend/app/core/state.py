@@ -1,6 +1,25 @@
+from pathlib import Path
+
+from app.backends import create_backend
+from app.core import config, metrics
+from app.managers.broadcast_buffer import BroadcastBuffer
 from app.managers.connection_manager import ConnectionManager
+from app.managers.event_store import EventStore
+from app.managers.firmware_catalog import DownloadSlots, FirmwareCatalog
 from app.managers.lift_manager import LiftManager
 
 
-cm = ConnectionManager()
-lm = LiftManager(cm)
\ No newline at end of file
+viewers = BroadcastBuffer(config.STREAM_BUFFER_SIZE)
+cm = ConnectionManager(viewers=viewers)
+bus = create_backend(config.BACKEND_URL)
+events = (
+    EventStore(Path(config.EVENT_DB_PATH), retention_days=config.EVENT_RETENTION_DAYS)
+    if config.EVENT_DB_PATH
+    else None
+)
+lm = LiftManager(cm, bus, events)
+firmware = FirmwareCatalog(Path("app/binaries"))
+download_slots = DownloadSlots(config.FIRMWARE_MAX_DOWNLOADS)
+
+metrics.bind_connection_manager(cm)
+metrics.bind_lift_manager(lm)
@@ -1,10 +1,21 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from prometheus_fastapi_instrumentator import Instrumentator
 
 from app.api import api, admin
+from app.core.state import lm
 from app.websocket.router import router as ws_router
 
-app = FastAPI(root_path="/api")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await lm.start()
+    yield
+    await lm.stop()
+
+
+app = FastAPI(root_path="/api", lifespan=lifespan)
 
 Instrumentator().instrument(app, metric_namespace="smartlift").expose(app)
 
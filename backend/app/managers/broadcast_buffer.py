@@ -0,0 +1,58 @@
+import asyncio
+from collections import deque
+from itertools import islice
+from typing import Deque, List, Optional, Tuple
+
+from app.utils.frames import Frame
+
+
+def sse_event(seq: int, frame: Frame) -> bytes:
+    """A Server-Sent Event carrying `frame`, with `seq` as its id."""
+    data = frame.data
+    if b"\n" in data:
+        # only JSON whitespace can be a raw newline; an event needs one line
+        data = data.replace(b"\n", b"")
+    return b"id: %d\ndata: %s\n\n" % (seq, data)
+
+
+class BroadcastBuffer:
+    """The last `size` client broadcasts, shared by every read-only viewer.
+
+    Each broadcast is stored once, with its sequence number, as the frame
+    and as a ready-made Server-Sent Event. Waiting viewers share a single
+    future that `append` resolves, so an idle viewer costs nothing and a
+    busy one only writes bytes that already exist.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._events: Deque[Tuple[Frame, bytes]] = deque(maxlen=size)
+        # sequence number of the newest event
+        self.seq = 0
+        self._waiter: Optional[asyncio.Future] = None
+
+    def append(self, frame: Frame) -> None:
+        self.seq += 1
+        self._events.append((frame, sse_event(self.seq, frame)))
+
+        if self._waiter is not None:
+            if not self._waiter.done():
+                self._waiter.set_result(None)
+            self._waiter = None
+
+    def since(self, seq: int) -> Optional[List[Tuple[Frame, bytes]]]:
+        """Events after `seq`, or None if some of them were already dropped."""
+        missing = self.seq - seq
+        if missing < 0 or missing > len(self._events):
+            return None
+        return list(islice(self._events, len(self._events) - missing, None))
+
+    async def wait(self, timeout: float) -> None:
+        """Return after the next `append`, or after `timeout` seconds."""
+        if self._waiter is None:
+            self._waiter = asyncio.get_running_loop().create_future()
+
+        try:
+            # shielded: a viewer timing out must not cancel the others' wait
+            await asyncio.wait_for(asyncio.shield(self._waiter), timeout)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,172 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from app.core import metrics
+
+# (con_id, lift_id, direction, toggle)
+CommandKey = Tuple[str, Any, Any, Any]
+
+_acked = metrics.move_commands.labels("acked")
+_timed_out = metrics.move_commands.labels("timeout")
+_offline = metrics.move_commands.labels("offline")
+
+
+class PendingCommand:
+    __slots__ = ("cmd_id", "key", "client_id", "client_cmd_id", "sent", "expires")
+
+    def __init__(
+        self,
+        cmd_id: int,
+        key: CommandKey,
+        client_id: str,
+        client_cmd_id: Any,
+        sent: float,
+        timeout: float,
+    ) -> None:
+        self.cmd_id = cmd_id
+        self.key = key
+        self.client_id = client_id
+        self.client_cmd_id = client_cmd_id
+        self.sent = sent
+        self.expires = sent + timeout
+
+
+class CommandTracker:
+    """Matches move_lift commands with the controller's lift_moved reply.
+
+    Every command delivered to a local controller gets a `cmd_id`, which
+    the firmware echoes back. Replies without one (older firmware) are
+    matched to the oldest pending command with the same lift, direction
+    and toggle. Commands not acknowledged within `timeout` seconds, or
+    whose controller went away, are handed to `on_failed`.
+
+    All commands share one timeout, so they expire in the order they were
+    sent and a single timer for the oldest one is enough.
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        on_failed: Callable[[PendingCommand, str], Awaitable[None]],
+    ) -> None:
+        self.timeout = timeout
+        self._on_failed = on_failed
+
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, PendingCommand] = {}
+        self._by_key: Dict[CommandKey, Deque[int]] = {}
+
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def issue(
+        self,
+        cmd_id: int,
+        con_id: str,
+        lift_id: Any,
+        direction: Any,
+        toggle: Any,
+        client_id: str,
+        client_cmd_id: Any = None,
+    ) -> None:
+        """Start waiting for the reply to a command just sent."""
+        if self.timeout <= 0:
+            return
+
+        key = (con_id, lift_id, direction, toggle)
+        self._pending[cmd_id] = PendingCommand(
+            cmd_id, key, client_id, client_cmd_id, time.monotonic(), self.timeout
+        )
+        self._by_key.setdefault(key, deque()).append(cmd_id)
+
+        if self._timer is None:
+            self._schedule()
+
+    def _pop(self, cmd_id: int) -> Optional[PendingCommand]:
+        cmd = self._pending.pop(cmd_id, None)
+        if cmd is None:
+            return None
+
+        ids = self._by_key.get(cmd.key)
+        if ids is not None:
+            try:
+                ids.remove(cmd_id)
+            except ValueError:
+                pass
+            if not ids:
+                del self._by_key[cmd.key]
+
+        return cmd
+
+    def ack(self, con_id: str, obj: Dict[str, Any]) -> Optional[float]:
+        """Resolve the command answered by a lift_moved; returns the latency."""
+        if not self._pending:
+            return None
+
+        cmd_id = obj.get("cmd_id")
+
+        if cmd_id is None:
+            ids = self._by_key.get((con_id, obj.get("lift_id"), obj.get("direction"), obj.get("toggle")))
+            if not ids:
+                return None
+            cmd_id = ids[0]
+
+        cmd = self._pending.get(cmd_id) if isinstance(cmd_id, int) else None
+
+        # a controller can only answer its own commands
+        if cmd is None or cmd.key[0] != con_id:
+            return None
+
+        self._pop(cmd_id)
+
+        took = time.monotonic() - cmd.sent
+
+        _acked.inc()
+        metrics.move_ack_seconds.observe(took)
+        return took
+
+    def _schedule(self) -> None:
+        oldest = next(iter(self._pending.values()), None)
+        if oldest is None:
+            self._timer = None
+            return
+
+        loop = asyncio.get_running_loop()
+        self._timer = loop.call_at(
+            loop.time() + max(0.0, oldest.expires - time.monotonic()),
+            self._on_tick,
+        )
+
+    def _on_tick(self) -> None:
+        now = time.monotonic()
+        expired = []
+
+        # dicts keep insertion order, which is expiry order
+        for cmd in self._pending.values():
+            if cmd.expires > now:
+                break
+            expired.append(cmd)
+
+        for cmd in expired:
+            self._pop(cmd.cmd_id)
+            _timed_out.inc()
+            asyncio.ensure_future(self._on_failed(cmd, "timeout"))
+
+        self._schedule()
+
+    def forget(self, con_id: str) -> None:
+        """Fail all commands waiting for a controller that went away."""
+        lost = [cmd for cmd in self._pending.values() if cmd.key[0] == con_id]
+
+        for cmd in lost:
+            self._pop(cmd.cmd_id)
+            _offline.inc()
+            asyncio.ensure_future(self._on_failed(cmd, "offline"))
@@ -1,31 +1,291 @@
 import asyncio
-from typing import Dict, Optional
+import secrets
+import time
+from collections import deque
+from enum import Enum
+from typing import Awaitable, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Tuple, Union
 from fastapi import WebSocket
 
+from app.core import config, metrics
 from app.core.logging import logger
+from app.managers.broadcast_buffer import BroadcastBuffer
+from app.managers.subscriptions import LiftKey, Subscriptions
+from app.models.messages import Case
+from app.utils import binary_protocol
+from app.utils.frames import BATCH_SUBPROTOCOL, Frame
+
+Message = Union[str, Frame]
+
+_lock_wait = metrics.lock_wait_seconds.labels("connections")
+_broadcast_clients = metrics.broadcast_seconds.labels("clients")
+_broadcast_topic = metrics.broadcast_seconds.labels("topic")
+_writer_failed = metrics.send_failures.labels("writer")
+_urgent_failed = metrics.send_failures.labels("urgent")
+
+# seconds to wait for a close handshake when evicting a connection
+CLOSE_TIMEOUT = 1.0
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What happens when a connection's outbound queue is full."""
+
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class _Session:
+    """Replay state of a resumable client connection.
+
+    Frames are numbered as they are handed to the socket and the last
+    `size` of them are kept (the shared Frame objects, not copies), so a
+    client that comes back with the number of messages it processed gets
+    exactly the ones it missed. `expiry` runs while the client is away.
+    """
+
+    __slots__ = ("token", "sent", "replay", "expiry", "on_expired")
+
+    def __init__(self, size: int) -> None:
+        self.token = secrets.token_urlsafe(16)
+        self.sent = 0
+        self.replay: Deque[Frame] = deque(maxlen=size)
+        self.expiry: Optional[asyncio.TimerHandle] = None
+        self.on_expired: Optional[Callable[[str], Awaitable[None]]] = None
+
+    def record(self, frames: List[Frame]) -> None:
+        self.sent += len(frames)
+        self.replay.extend(frames)
+
+    def can_rewind(self, ack: int) -> bool:
+        return 0 <= self.sent - ack <= len(self.replay)
+
+    def rewind(self, ack: int) -> List[Frame]:
+        """Take back the frames sent after `ack` (see `can_rewind`)."""
+        frames = [self.replay.pop() for _ in range(self.sent - ack)]
+        frames.reverse()
+        self.sent = ack
+        return frames
+
+    def cancel_expiry(self) -> None:
+        if self.expiry is not None:
+            self.expiry.cancel()
+            self.expiry = None
+
+
+class _Connection:
+    """A socket with a bounded outbound queue drained by its own writer task.
+
+    A connection with a `session` outlives its socket for a while: `ws`
+    is None and frames keep queueing until the client resumes.
+    """
+
+    __slots__ = (
+        "client_id", "ws", "maxsize", "binary", "batch", "session", "queue", "wakeup", "writer",
+    )
+
+    def __init__(
+        self,
+        client_id: str,
+        ws: WebSocket,
+        maxsize: int,
+        binary: bool = False,
+        batch: int = 1,
+    ) -> None:
+        self.client_id = client_id
+        self.ws: Optional[WebSocket] = ws
+        self.maxsize = maxsize
+        # negotiated the compact controller protocol
+        self.binary = binary
+        # max. queued frames sent as one JSON array (batch subprotocol)
+        self.batch = batch
+        self.session: Optional[_Session] = None
+        self.queue: Deque[Tuple[Optional[Hashable], Frame]] = deque()
+        self.wakeup = asyncio.Event()
+        self.writer: Optional[asyncio.Task] = None
+
+    def put(
+        self,
+        frame: Frame,
+        key: Optional[Hashable],
+        policy: SlowConsumerPolicy,
+        urgent: bool = False,
+    ) -> bool:
+        """Queue a frame. Returns False if the connection should be dropped.
+
+        Frames sharing a `key` supersede each other, so with the coalesce
+        policy an older queued frame with the same key is replaced first.
+        Urgent frames jump the queue and push out the newest normal one.
+        """
+        q = self.queue
+
+        if urgent:
+            if len(q) >= self.maxsize:
+                q.pop()
+                metrics.send_queue_overflow.labels("drop_oldest").inc()
+
+            q.appendleft((None, frame))
+            self.wakeup.set()
+            return True
+
+        if len(q) >= self.maxsize:
+            if policy is SlowConsumerPolicy.DISCONNECT:
+                metrics.send_queue_overflow.labels(policy.value).inc()
+                return False
+
+            merged = False
+            if policy is SlowConsumerPolicy.COALESCE and key is not None:
+                for i, (k, _) in enumerate(q):
+                    if k == key:
+                        del q[i]
+                        merged = True
+                        break
+
+            if not merged:
+                q.popleft()
+
+            metrics.send_queue_overflow.labels(
+                "coalesce" if merged else "drop_oldest"
+            ).inc()
+
+        q.append((key, frame))
+        self.wakeup.set()
+        return True
+
+    async def drain(self) -> None:
+        """Send queued frames until cancelled or the socket fails."""
+        q = self.queue
+
+        while True:
+            if not q:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+
+            frames = [q.popleft()[1]]
+
+            # whatever piled up while the last send was in flight goes together
+            while self.batch > len(frames) and q:
+                frames.append(q.popleft()[1])
+
+            if self.session is not None:
+                self.session.record(frames)
+
+            await self.send_frame(frames[0] if len(frames) == 1 else Frame.batch(frames))
+
+    def send_frame(self, frame: Frame) -> Awaitable[None]:
+        if self.binary:
+            data = frame.binary
+            if data is not None:
+                return self.ws.send_bytes(data)
+
+        return self.ws.send_text(frame.text)
+
+    def stop_writer(self) -> None:
+        if self.writer is not None and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+        self.writer = None
+
+    def stop(self) -> None:
+        """Cancel the writer and discard whatever is still queued."""
+        self.stop_writer()
+
+        if self.session is not None:
+            self.session.cancel_expiry()
+
+        self.queue.clear()
 
 
 class ConnectionManager:
-    """Tracks active WebSocket connections in a threadsafe (async) way."""
+    """Tracks active WebSocket connections in a threadsafe (async) way.
 
-    def __init__(self) -> None:
+    Sending never awaits the socket: every connection owns a bounded queue
+    and a writer task, so one slow peer cannot stall a broadcast.
+    """
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        policy: Optional[SlowConsumerPolicy] = None,
+        viewers: Optional[BroadcastBuffer] = None,
+    ) -> None:
         self._lock = asyncio.Lock()
-        self._connections: Dict[str, WebSocket] = {}
+        self._connections: Dict[str, _Connection] = {}
+
+        # read-only viewers get every client broadcast from here
+        self.viewers = viewers
+
+        # what each client connection watches, see `subscribe`
+        self.subscriptions: Subscriptions[_Connection] = Subscriptions()
+
+        # awaited with the id of every connection dropped by the server
+        # (see `_evict`), so its state is cleaned up like on a disconnect
+        self.on_evicted: Optional[Callable[[str], Awaitable[None]]] = None
+
+        self.queue_size = queue_size or config.SEND_QUEUE_SIZE
+
+        if policy is None:
+            try:
+                policy = SlowConsumerPolicy(config.SLOW_CONSUMER_POLICY)
+            except ValueError:
+                logger.warning(
+                    "Unknown slow consumer policy %r; using coalesce",
+                    config.SLOW_CONSUMER_POLICY,
+                )
+                policy = SlowConsumerPolicy.COALESCE
+
+        self.policy = policy
+
+    @staticmethod
+    def _negotiated(conn: _Connection, subprotocol: Optional[str]) -> None:
+        conn.binary = subprotocol == binary_protocol.SUBPROTOCOL
+        conn.batch = config.WS_BATCH_MAX if subprotocol == BATCH_SUBPROTOCOL else 1
 
-    async def connect(self, client_id: str, ws: WebSocket) -> None:
-        """Accept the socket and ensure at most one connection per id."""
-        await ws.accept()
+    @staticmethod
+    async def _send_session(conn: _Connection, resumed: bool) -> None:
+        # sent before the writer starts and outside the numbered stream
+        await conn.ws.send_text(
+            Frame.of(
+                {
+                    "case": Case.SESSION,
+                    "token": conn.session.token,
+                    "resumed": resumed,
+                    "grace": config.CLIENT_RESUME_GRACE,
+                }
+            ).text
+        )
 
+    async def connect(
+        self,
+        client_id: str,
+        ws: WebSocket,
+        subprotocol: Optional[str] = None,
+        resumable: bool = False,
+    ) -> None:
+        """Accept the socket and ensure at most one connection per id.
+
+        A `resumable` connection gets a session (see `suspend`/`resume`),
+        announced to the client with a "session" message.
+        """
+        await ws.accept(subprotocol=subprotocol)
+
+        conn = _Connection(client_id, ws, self.queue_size)
+        self._negotiated(conn, subprotocol)
+
+        if resumable:
+            conn.session = _Session(config.CLIENT_REPLAY_SIZE)
+            await self._send_session(conn, resumed=False)
+
+        conn.writer = asyncio.create_task(self._run_writer(conn))
+
+        waited = time.perf_counter()
         async with self._lock:
-            old = self._connections.pop(client_id, None)
+            _lock_wait.observe(time.perf_counter() - waited)
 
-            if old is not None:
-                try:
-                    await old.close()
-                except Exception:
-                    pass
+            old = self._connections.pop(client_id, None)
+            self._connections[client_id] = conn
 
-            self._connections[client_id] = ws
+            if client_id.startswith("cli"):
+                self.subscriptions.add(client_id, conn)
 
             logger.debug(
                 "Connected %s (total=%d)",
@@ -33,55 +293,333 @@ class ConnectionManager:
                 len(self._connections),
             )
 
-    async def disconnect(self, client_id: str, ws: Optional[WebSocket] = None) -> None:
-        """Forget the connection. Does not close `ws`."""
+        if old is not None:
+            old.stop()
+            try:
+                await old.ws.close()
+            except Exception:
+                pass
+
+    async def disconnect(self, client_id: str, ws: Optional[WebSocket] = None) -> bool:
+        """Forget the connection. Does not close `ws`.
+
+        Returns False if `ws` was already replaced or evicted.
+        """
+        waited = time.perf_counter()
         async with self._lock:
+            _lock_wait.observe(time.perf_counter() - waited)
+
             current = self._connections.get(client_id)
 
-            if current is ws or (ws is None and current is not None):
+            if current is not None and (ws is None or current.ws is ws):
                 self._connections.pop(client_id, None)
+                self.subscriptions.remove(client_id, current)
+                current.stop()
 
                 logger.debug(
                     "Disconnected %s (total=%d)",
                     client_id,
                     len(self._connections),
                 )
+                return True
 
-    async def send(self, client_id: str, message: str) -> None:
-        """Send a text message to a specific connection."""
-        async with self._lock:
-            ws = self._connections.get(client_id)
+        return False
+
+    async def resume(
+        self,
+        client_id: str,
+        ws: WebSocket,
+        token: str,
+        ack: int,
+        subprotocol: Optional[str] = None,
+    ) -> bool:
+        """Attach `ws` to the session `token` of `client_id`, if it still exists.
 
-        if not ws:
-            return
+        `ack` is the number of messages the client processed; the ones
+        sent after it are sent again, followed by whatever queued up in
+        the meantime. Returns False (without accepting `ws`) if the
+        session is gone or cannot replay from `ack`.
+        """
+        conn = self._connections.get(client_id)
+        session = conn.session if conn is not None else None
+
+        if session is None or not secrets.compare_digest(session.token, token):
+            return False
+
+        if not session.can_rewind(ack):
+            logger.info("Client %s cannot resume from %d; sending snapshots", client_id, ack)
+            return False
+
+        # nothing may be sent or expire while the new socket is accepted;
+        # a reconnect may also beat the old socket's disconnect
+        old = conn.ws
+        conn.stop_writer()
+        session.cancel_expiry()
 
         try:
-            await ws.send_text(message)
+            await ws.accept(subprotocol=subprotocol)
         except Exception:
-            await self.disconnect(client_id)
+            if old is None:
+                self._arm_expiry(conn, config.CLIENT_RESUME_GRACE)
+            else:
+                conn.writer = asyncio.create_task(self._run_writer(conn))
+            raise
 
-    async def broadcast(self, message: str) -> None:
-        """Send message to all connections."""
-        async with self._lock:
-            items = list(self._connections.items())
+        frames = session.rewind(ack)
+        conn.ws = ws
+        self._negotiated(conn, subprotocol)
+        conn.queue.extendleft((None, frame) for frame in reversed(frames))
+
+        await self._send_session(conn, resumed=True)
+        conn.writer = asyncio.create_task(self._run_writer(conn))
 
-        for cid, ws in items:
+        logger.info("Client %s resumed, replaying %d messages", client_id, len(frames))
+
+        if old is not None:
             try:
-                await ws.send_text(message)
+                await asyncio.wait_for(old.close(), CLOSE_TIMEOUT)
             except Exception:
-                await self.disconnect(cid)
+                pass
+
+        return True
+
+    async def suspend(
+        self,
+        client_id: str,
+        ws: WebSocket,
+        grace: float,
+        on_expired: Callable[[str], Awaitable[None]],
+    ) -> bool:
+        """Keep a dropped client's session and queue for `grace` seconds.
+
+        `on_expired` is awaited if the client does not resume in time.
+        Returns False if `ws` has no session or was already replaced.
+        """
+        conn = self._connections.get(client_id)
 
-    async def broadcast_clients(self, message: str) -> None:
-        """Send message to all 'cli*' connections."""
+        if conn is None or conn.session is None or conn.ws is not ws:
+            return False
+
+        conn.stop_writer()
+        conn.ws = None
+
+        conn.session.on_expired = on_expired
+        self._arm_expiry(conn, grace)
+        return True
+
+    def _arm_expiry(self, conn: _Connection, grace: float) -> None:
+        conn.session.expiry = asyncio.get_running_loop().call_later(
+            grace, lambda: asyncio.ensure_future(self._end_session(conn))
+        )
+
+    async def end_session(self, client_id: str) -> bool:
+        """End a suspended session now; True if there was one."""
+        conn = self._connections.get(client_id)
+
+        if conn is None or conn.session is None or conn.ws is not None:
+            return False
+
+        conn.session.on_expired = None
+        await self._end_session(conn)
+        return True
+
+    async def _end_session(self, conn: _Connection) -> None:
+        waited = time.perf_counter()
         async with self._lock:
-            items = [
-                (cid, ws)
-                for cid, ws in self._connections.items()
-                if cid.startswith("cli")
-            ]
+            _lock_wait.observe(time.perf_counter() - waited)
+
+            # resumed or replaced in the meantime
+            if self._connections.get(conn.client_id) is not conn or conn.ws is not None:
+                return
+
+            del self._connections[conn.client_id]
+            self.subscriptions.remove(conn.client_id, conn)
+            on_expired = conn.session.on_expired
+            conn.stop()
+
+        if on_expired is not None:
+            await on_expired(conn.client_id)
+
+    def subscribe(
+        self,
+        client_id: str,
+        controllers: Iterable[str] = (),
+        lifts: Iterable[LiftKey] = (),
+    ) -> bool:
+        """Limit lift and controller events for `client_id` to these topics.
+
+        Replaces the previous subscription; no topics at all means every
+        event again. It lasts as long as the connection, including a
+        resumed session. Returns False if `client_id` is not connected here.
+        """
+        conn = self._connections.get(client_id)
+
+        if conn is None or not client_id.startswith("cli"):
+            return False
+
+        self.subscriptions.subscribe(client_id, conn, controllers, lifts)
+        return True
+
+    async def _run_writer(self, conn: _Connection) -> None:
+        try:
+            await conn.drain()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            _writer_failed.inc()
+
+            if conn.session is not None:
+                # the receive side sees the close and suspends the session
+                try:
+                    await asyncio.wait_for(conn.ws.close(), CLOSE_TIMEOUT)
+                except Exception:
+                    pass
+                return
+
+            await self._evict([conn])
+
+    async def _evict(self, conns: List[_Connection]) -> None:
+        """Drop connections that could not keep up and close their sockets."""
+        for conn in conns:
+            logger.warning("Evicting connection %s", conn.client_id)
+
+            if conn.ws is None:
+                # suspended session: it ends now instead of at expiry
+                await self._end_session(conn)
+                continue
+
+            dropped = await self.disconnect(conn.client_id, conn.ws)
 
-        for cid, ws in items:
             try:
-                await ws.send_text(message)
+                # a dead peer must not stall whoever triggered the eviction
+                await asyncio.wait_for(conn.ws.close(), CLOSE_TIMEOUT)
             except Exception:
-                await self.disconnect(cid)
\ No newline at end of file
+                pass
+
+            # the receive side finds the socket gone and leaves this to us
+            if dropped and self.on_evicted is not None:
+                await self.on_evicted(conn.client_id)
+
+    async def evict(self, client_id: str) -> bool:
+        """Drop and close a connection, e.g. one that stopped answering.
+
+        Returns False if `client_id` is not connected to this process.
+        """
+        conn = self._connections.get(client_id)
+
+        if conn is None:
+            return False
+
+        await self._evict([conn])
+        return True
+
+    @staticmethod
+    def _frame(message: Message) -> Frame:
+        return message if isinstance(message, Frame) else Frame(text=message)
+
+    async def send(self, client_id: str, message: Message, *, key: Optional[Hashable] = None) -> bool:
+        """Queue a text message for a specific connection.
+
+        Returns False if `client_id` is not connected to this process.
+        """
+        conn = self._connections.get(client_id)
+
+        if not conn:
+            return False
+
+        if not conn.put(self._frame(message), key, self.policy):
+            await self._evict([conn])
+
+        return True
+
+    async def broadcast_clients(
+        self,
+        message: Message,
+        *,
+        key: Optional[Hashable] = None,
+        urgent: bool = False,
+        topic: Optional[Tuple[str, Optional[int]]] = None,
+    ) -> None:
+        """Queue message for all 'cli*' connections and read-only viewers.
+
+        A message about a lift or controller carries `topic`, (con_id,
+        lift_id) or (con_id, None), and only reaches the clients watching
+        it (see `subscribe`). Viewers always get everything.
+        """
+        started = time.perf_counter()
+        frame = self._frame(message)
+
+        if self.viewers is not None:
+            self.viewers.append(frame)
+
+        if topic is None:
+            slow = [
+                conn
+                for cid, conn in self._connections.items()
+                if cid.startswith("cli") and not conn.put(frame, key, self.policy, urgent)
+            ]
+            _broadcast_clients.observe(time.perf_counter() - started)
+        else:
+            slow = [
+                conn
+                for conn in self.subscriptions.watching(*topic)
+                if not conn.put(frame, key, self.policy, urgent)
+            ]
+            _broadcast_topic.observe(time.perf_counter() - started)
+
+        if slow:
+            await self._evict(slow)
+
+    @staticmethod
+    async def _send_now(conn: _Connection, frame: Frame, deadline: float) -> Optional[float]:
+        start = time.perf_counter()
+
+        try:
+            await asyncio.wait_for(conn.send_frame(frame), deadline)
+        except Exception:
+            _urgent_failed.inc()
+            return None
+
+        return time.perf_counter() - start
+
+    def send_urgent(
+        self, message: Message, *, prefix: str, deadline: float
+    ) -> "asyncio.Future[Dict[str, Optional[float]]]":
+        """Start sending to every `prefix*` connection right now, in parallel.
+
+        Skips the outbound queues and discards what is still queued there,
+        so nothing older can follow the message. The sends are scheduled
+        before this returns; await the result for the send time per
+        connection (None where it failed). Connections that do not take
+        the message within `deadline` seconds are closed.
+        """
+        frame = self._frame(message)
+        conns = [conn for cid, conn in self._connections.items() if cid.startswith(prefix)]
+
+        for conn in conns:
+            conn.queue.clear()
+
+        sends = [asyncio.create_task(self._send_now(conn, frame, deadline)) for conn in conns]
+        return asyncio.ensure_future(self._collect_urgent(conns, sends))
+
+    async def _collect_urgent(
+        self, conns: List[_Connection], sends: List["asyncio.Task[Optional[float]]"]
+    ) -> Dict[str, Optional[float]]:
+        results = await asyncio.gather(*sends)
+
+        failed = [conn for conn, took in zip(conns, results) if took is None]
+        if failed:
+            await self._evict(failed)
+
+        return {conn.client_id: took for conn, took in zip(conns, results)}
+
+    def count(self, prefix: str) -> int:
+        """Number of connected sockets whose id starts with `prefix`."""
+        return sum(
+            1 for cid, conn in self._connections.items()
+            if cid.startswith(prefix) and conn.ws is not None
+        )
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Current outbound queue depth per connection."""
+        return {cid: len(conn.queue) for cid, conn in self._connections.items()}
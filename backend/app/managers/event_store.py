@@ -0,0 +1,221 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.logging import logger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id        INTEGER PRIMARY KEY,
+    ts        REAL NOT NULL,
+    kind      TEXT NOT NULL,
+    con_id    TEXT,
+    lift_id   INTEGER,
+    client_id TEXT,
+    data      TEXT
+);
+CREATE INDEX IF NOT EXISTS events_lift ON events (con_id, lift_id, ts);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+"""
+
+Row = Tuple[float, str, Optional[str], Optional[int], Optional[str], Optional[str]]
+
+_written = metrics.events_recorded.labels("written")
+_dropped = metrics.events_recorded.labels("dropped")
+
+
+class EventStore:
+    """Append-only history of moves, power changes and e-stops in SQLite.
+
+    `record` only appends to an in-memory buffer; a background task writes
+    the buffer in one transaction every `flush_interval` seconds from a
+    worker thread, so the control path never waits for the disk. If the
+    disk falls behind, the oldest unwritten events are dropped once
+    `max_pending` is reached.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        flush_interval: float = 1.0,
+        retention_days: float = 90,
+        max_pending: int = 100_000,
+    ) -> None:
+        self.path = path
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+
+        self._pending: Deque[Row] = deque(maxlen=max_pending)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pruned = 0.0
+
+    # ---------- lifecycle ----------
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript(_SCHEMA)
+        self._db = db
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self._open)
+        self._task = asyncio.create_task(self._run())
+
+        logger.info("Event store at %s", self.path)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+        if self._db is not None:
+            await asyncio.to_thread(self._close)
+
+    def _close(self) -> None:
+        # a write or prune of the cancelled task may still run in its thread
+        with self._db_lock:
+            self._db.close()
+            self._db = None
+
+    # ---------- writing ----------
+
+    def record(
+        self,
+        kind: str,
+        con_id: Optional[str] = None,
+        lift_id: Optional[int] = None,
+        client_id: Optional[str] = None,
+        **data: Any,
+    ) -> None:
+        """Queue an event; never blocks."""
+        if len(self._pending) == self._pending.maxlen:
+            _dropped.inc()
+
+        self._pending.append(
+            (time.time(), kind, con_id, lift_id, client_id, json.dumps(data) if data else None)
+        )
+
+    def _write(self, rows: List[Row]) -> None:
+        with self._db_lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT INTO events (ts, kind, con_id, lift_id, client_id, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                # left open, the transaction would make every later BEGIN fail
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                raise
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_days * 86400
+
+        with self._db_lock:
+            deleted = self._db.execute("DELETE FROM events WHERE ts < ?", (cutoff,)).rowcount
+
+        if deleted:
+            logger.info("Pruned %d events older than %s days", deleted, self.retention_days)
+
+    async def flush(self) -> None:
+        if not self._pending or self._db is None:
+            return
+
+        rows = list(self._pending)
+        self._pending.clear()
+
+        try:
+            await asyncio.to_thread(self._write, rows)
+            _written.inc(len(rows))
+        except sqlite3.Error as exc:
+            _dropped.inc(len(rows))
+            logger.error("Failed to write %d events: %s", len(rows), exc)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+            if self.retention_days > 0 and time.monotonic() - self._pruned > 3600:
+                self._pruned = time.monotonic()
+                try:
+                    await asyncio.to_thread(self._prune)
+                except sqlite3.Error as exc:
+                    logger.error("Failed to prune events: %s", exc)
+
+    # ---------- reading ----------
+
+    def _query(self, sql: str, args: List[Any]) -> List[Dict[str, Any]]:
+        with self._db_lock:
+            rows = self._db.execute(sql, args).fetchall()
+
+        return [
+            {
+                "ts": ts,
+                "kind": kind,
+                "con_id": con_id,
+                "lift_id": lift_id,
+                "client_id": client_id,
+                **(json.loads(data) if data else {}),
+            }
+            for ts, kind, con_id, lift_id, client_id, data in rows
+        ]
+
+    async def query(
+        self,
+        con_id: Optional[str] = None,
+        lift_id: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        kind: Optional[str] = None,
+        limit: int = 500,
+    ) -> List[Dict[str, Any]]:
+        """Newest first; events still in the buffer are written first."""
+        if self._db is None:
+            return []
+
+        await self.flush()
+
+        where: List[str] = []
+        args: List[Any] = []
+
+        for column, value in (("con_id", con_id), ("lift_id", lift_id), ("kind", kind)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+
+        if since is not None:
+            where.append("ts >= ?")
+            args.append(since)
+
+        if until is not None:
+            where.append("ts < ?")
+            args.append(until)
+
+        sql = "SELECT ts, kind, con_id, lift_id, client_id, data FROM events"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ts DESC LIMIT ?"
+        args.append(limit)
+
+        return await asyncio.to_thread(self._query, sql, args)
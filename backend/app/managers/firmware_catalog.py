@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from packaging.version import InvalidVersion, Version
+
+from app.core.logging import logger
+
+
+class FirmwareImage:
+    """A firmware file with metadata computed once when it is indexed."""
+
+    __slots__ = ("path", "version", "con_id", "stat", "size", "sha256", "md5", "etag")
+
+    def __init__(self, path: Path, version: Version, con_id: Optional[str], stat: os.stat_result) -> None:
+        self.path = path
+        self.version = version
+        self.con_id = con_id
+        self.stat = stat
+        self.size = stat.st_size
+
+        sha256 = hashlib.sha256()
+        md5 = hashlib.md5()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                sha256.update(chunk)
+                md5.update(chunk)
+
+        self.sha256 = sha256.hexdigest()
+        # checked by the ESP8266 updater (x-MD5 header)
+        self.md5 = md5.hexdigest()
+        self.etag = f'"{self.sha256[:32]}"'
+
+    def unchanged(self, stat: os.stat_result) -> bool:
+        return stat.st_mtime_ns == self.stat.st_mtime_ns and stat.st_size == self.size
+
+
+def rollout_bucket(con_id: str) -> int:
+    """Stable 0..99 bucket of a controller for staged rollouts."""
+    return int.from_bytes(hashlib.sha256(con_id.encode()).digest()[:4], "big") % 100
+
+
+def parse_name(stem: str) -> Optional[Tuple[Optional[str], Version]]:
+    """Split a file stem into (con_id, version).
+
+    "1.2.0" is a generic image, "con1-1.2.0" an image for con1. Anything
+    else is not firmware.
+    """
+    try:
+        return None, Version(stem)
+    except InvalidVersion:
+        pass
+
+    con_id, sep, rest = stem.partition("-")
+    if not sep or not con_id:
+        return None
+
+    try:
+        return con_id, Version(rest)
+    except InvalidVersion:
+        return None
+
+
+class FirmwareCatalog:
+    """Index of the firmware directory, rebuilt only when it changes.
+
+    Generic `<version>.bin` files decide the latest version; a
+    `<con_id>-<version>.bin` file overrides the generic image of that
+    version for one controller. Changes are picked up by checking the
+    directory mtime at most once per `check_interval`, so files should be
+    replaced by renaming (as init.sh does), not rewritten in place.
+
+    An optional `rollout.json` ({"1.3.0": 25, ...}) limits a version to a
+    percentage of controllers; controllers outside it keep getting the
+    newest version they are in. Versions not listed go to everybody.
+    """
+
+    ROLLOUT_FILE = "rollout.json"
+
+    def __init__(self, directory: Path, check_interval: float = 1.0) -> None:
+        self.directory = directory
+        self.check_interval = check_interval
+
+        self.latest: Optional[Version] = None
+        self.images: Dict[Tuple[Optional[str], Version], FirmwareImage] = {}
+        self.rollout: Dict[Version, int] = {}
+
+        # generic versions, newest first
+        self._versions: List[Version] = []
+
+        self._by_name: Dict[str, FirmwareImage] = {}
+        self._dir_mtime: Optional[int] = None
+        self._rollout_mtime: Optional[int] = None
+        self._checked = 0.0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _mtime(path: Path) -> Optional[int]:
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _dir_changed(self) -> bool:
+        return (
+            self._mtime(self.directory) != self._dir_mtime
+            or self._mtime(self.directory / self.ROLLOUT_FILE) != self._rollout_mtime
+        )
+
+    def _load_rollout(self) -> Dict[Version, int]:
+        path = self.directory / self.ROLLOUT_FILE
+        self._rollout_mtime = self._mtime(path)
+
+        if self._rollout_mtime is None:
+            return {}
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+
+            return {Version(v): max(0, min(100, int(p))) for v, p in raw.items()}
+
+        except (OSError, ValueError, AttributeError, InvalidVersion) as exc:
+            logger.error("Ignoring invalid %s: %s", self.ROLLOUT_FILE, exc)
+            return {}
+
+    def _scan(self) -> None:
+        """Rebuild the index; files that did not change are not hashed again."""
+        try:
+            self._dir_mtime = self.directory.stat().st_mtime_ns
+            paths = list(self.directory.glob("*.bin"))
+        except FileNotFoundError:
+            self._dir_mtime = None
+            paths = []
+
+        by_name: Dict[str, FirmwareImage] = {}
+        images: Dict[Tuple[Optional[str], Version], FirmwareImage] = {}
+
+        for path in paths:
+            parsed = parse_name(path.stem)
+            if parsed is None:
+                logger.warning("Ignoring firmware file with unknown name: %s", path.name)
+                continue
+
+            try:
+                stat = path.stat()
+                image = self._by_name.get(path.name)
+                if image is None or not image.unchanged(stat):
+                    image = FirmwareImage(path, parsed[1], parsed[0], stat)
+            except OSError as exc:
+                logger.error("Cannot index firmware %s: %s", path.name, exc)
+                continue
+
+            by_name[path.name] = image
+            images[(image.con_id, image.version)] = image
+
+        generic = sorted((v for con_id, v in images if con_id is None), reverse=True)
+
+        self._by_name = by_name
+        self.images = images
+        self.rollout = self._load_rollout()
+        self._versions = generic
+        self.latest = generic[0] if generic else None
+
+        logger.info(
+            "Firmware catalog: %d images, latest %s, rollout %s",
+            len(images),
+            self.latest,
+            {str(v): p for v, p in self.rollout.items()},
+        )
+
+    def latest_for(self, con_id: str) -> Optional[Version]:
+        """Newest version whose rollout includes `con_id`."""
+        bucket = None
+
+        for v in self._versions:
+            percent = self.rollout.get(v, 100)
+            if percent >= 100:
+                return v
+
+            if bucket is None:
+                bucket = rollout_bucket(con_id)
+            if bucket < percent:
+                return v
+
+        return None
+
+    async def refresh(self) -> None:
+        """Re-index the directory if it changed since the last scan."""
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return
+
+        async with self._lock:
+            if now - self._checked < self.check_interval:
+                return
+
+            if self._dir_changed():
+                # hashing touches the disk, keep it off the event loop
+                await asyncio.to_thread(self._scan)
+
+            self._checked = time.monotonic()
+
+    def lookup(self, con_id: str, version: Version) -> Optional[FirmwareImage]:
+        """Image to serve `con_id` for `version`: its own, else the generic one."""
+        return self.images.get((con_id, version)) or self.images.get((None, version))
+
+
+class DownloadSlots:
+    """Non-blocking cap on concurrent firmware downloads."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+
+    def try_acquire(self) -> bool:
+        if self.limit > 0 and self.active >= self.limit:
+            return False
+
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
@@ -0,0 +1,134 @@
+import asyncio
+import math
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from app.core.logging import logger
+
+
+class HeartbeatMonitor:
+    """Application-level liveness for controllers on one shared timer wheel.
+
+    Any inbound frame counts as a sign of life (`touch` only stores a
+    timestamp). A controller quiet for `interval` seconds gets a ping; if
+    nothing arrives within `timeout` after it, `on_dead` is called.
+
+    Controllers are only evicted once they have answered a ping at least
+    once (`pong`), so firmware without heartbeat support is pinged but
+    never dropped.
+
+    All controllers share one wheel of `tick`-second slots advanced by a
+    single task. Slots are checked lazily: an entry that saw traffic since
+    it was scheduled is simply moved to a later slot.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        timeout: float,
+        ping: Callable[[str], Awaitable[None]],
+        on_dead: Callable[[str], Awaitable[None]],
+        tick: float = 1.0,
+    ) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.tick = tick
+
+        self._ping = ping
+        self._on_dead = on_dead
+
+        self._seen: Dict[str, float] = {}
+        self._pinged: Dict[str, float] = {}
+        self._answering: Set[str] = set()
+
+        size = math.ceil(max(interval, timeout) / tick) + 2
+        self._wheel: List[Set[str]] = [set() for _ in range(size)]
+        self._pos = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def add(self, con_id: str) -> None:
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        self._seen[con_id] = now
+        self._pinged.pop(con_id, None)
+        self._schedule(con_id, self.interval)
+
+    def remove(self, con_id: str) -> None:
+        # wheel entries of unknown ids are dropped when their slot comes up
+        self._seen.pop(con_id, None)
+        self._pinged.pop(con_id, None)
+        self._answering.discard(con_id)
+
+    def touch(self, con_id: str) -> None:
+        """Record inbound traffic; called for every controller frame."""
+        if con_id in self._seen:
+            self._seen[con_id] = time.monotonic()
+
+    def pong(self, con_id: str) -> None:
+        self._answering.add(con_id)
+        self.touch(con_id)
+
+    def _schedule(self, con_id: str, delay: float) -> None:
+        slots = min(len(self._wheel) - 1, max(1, math.ceil(delay / self.tick)))
+        self._wheel[(self._pos + slots) % len(self._wheel)].add(con_id)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick)
+
+            self._pos = (self._pos + 1) % len(self._wheel)
+            due, self._wheel[self._pos] = self._wheel[self._pos], set()
+
+            for con_id in due:
+                try:
+                    await self._check(con_id, time.monotonic())
+                except Exception:
+                    logger.exception("Heartbeat check for %s failed", con_id)
+
+    async def _check(self, con_id: str, now: float) -> None:
+        seen = self._seen.get(con_id)
+        if seen is None:
+            return
+
+        pinged = self._pinged.get(con_id)
+
+        if pinged is not None and seen < pinged:
+            if now - pinged < self.timeout:
+                self._schedule(con_id, pinged + self.timeout - now)
+                return
+
+            if con_id in self._answering:
+                logger.warning("Controller %s missed its heartbeat; evicting", con_id)
+                self.remove(con_id)
+                await self._on_dead(con_id)
+                return
+
+            # no heartbeat support, keep pinging but never evict
+            del self._pinged[con_id]
+            self._schedule(con_id, self.interval)
+            return
+
+        self._pinged.pop(con_id, None)
+
+        if now - seen < self.interval:
+            self._schedule(con_id, seen + self.interval - now)
+            return
+
+        self._pinged[con_id] = now
+        self._schedule(con_id, self.timeout)
+        await self._ping(con_id)
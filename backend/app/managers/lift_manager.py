@@ -1,169 +1,742 @@
-import os
 import asyncio
-import json
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from app.backends import Backend, MemoryBackend
+from app.core import config, metrics
 from app.core.logging import logger
+from app.managers.command_tracker import CommandKey, CommandTracker, PendingCommand
+from app.managers.event_store import EventStore
+from app.managers.heartbeat import HeartbeatMonitor
+from app.managers.lift_registry import LiftRegistry
+from app.managers.telemetry import TelemetryCoalescer
 from app.models.messages import Case, MoveLiftMsg, HelloMsg
+from app.utils.frames import Frame
+from app.utils.snapshot import SnapshotCache
 
 
-class LiftManager:
-    """Keeps runtime state and implements domain actions."""
+LiftKey = Tuple[str, int]
+
+_lock_wait = metrics.lock_wait_seconds.labels("controller")
+_resumed = metrics.controller_reconnects.labels("resumed")
+_rejected_offline = metrics.move_commands_rejected.labels("offline")
+_rejected_unknown = metrics.move_commands_rejected.labels("unknown_lift")
+_unroutable = metrics.move_commands_rejected.labels("unroutable")
+_expired = metrics.controller_reconnects.labels("expired")
+
+
+class ControllerState:
+    """Runtime state of one controller.
+
+    `lifts` is copy-on-write: it is replaced, never mutated, so readers can
+    hold on to it without taking `lock`. `lifts is None` means the
+    controller has not said hello (or went offline). `worker` is the id of
+    the backend worker holding the controller's socket.
+    """
+
+    __slots__ = ("con_id", "lifts", "power", "worker", "lock")
+
+    def __init__(self, con_id: str) -> None:
+        self.con_id = con_id
+        self.lifts: Optional[Dict[int, Dict[str, Any]]] = None
+        self.power: Optional[int] = None
+        self.worker: Optional[str] = None
+        self.lock = asyncio.Lock()
 
-    def __init__(self, connection_manager) -> None:
+
+class LiftManager:
+    """Keeps runtime state and implements domain actions.
+
+    State changes never await between reading and writing, so only the
+    per-controller locks (serializing hello/disconnect of one controller)
+    are needed; moves and readers are lock-free.
+
+    With several workers, every state change is applied locally and then
+    published through `bus`; other workers apply it via `apply_event`
+    with `origin` set and only fan out to their own sockets.
+
+    If `events` is given, moves, movement starts/stops, power changes,
+    controllers coming and going and e-stops are recorded there by the
+    worker where they happened.
+    """
+
+    def __init__(
+        self,
+        connection_manager,
+        bus: Optional[Backend] = None,
+        events: Optional[EventStore] = None,
+    ) -> None:
         self.cm = connection_manager
-        self.online_lifts: Dict[str, Dict[int, Dict[str, Any]]] = {}
-        self.active_lifts: Dict[str, int] = {}
-        self.lift_power: Dict[str, int] = {}
+        self.bus = bus or MemoryBackend()
+        self.events = events
+        self.controllers: Dict[str, ControllerState] = {}
+
+        # (con_id, lift_id) -> worker holding the controller's socket, for
+        # every online lift; moves are validated and routed with one lookup
+        self._routes: Dict[LiftKey, str] = {}
+
+        # who controls which lift, in both directions; with the direction
+        # held, so a dropped client's lift can be stopped precisely
+        self._holders: Dict[LiftKey, str] = {}
+        self._held: Dict[str, Tuple[LiftKey, Any]] = {}
+
+        self.telemetry = TelemetryCoalescer(self._publish_lift_moved, config.LIFT_MOVED_RATE_HZ)
+        self.commands = CommandTracker(config.MOVE_ACK_TIMEOUT_MS / 1000, self._move_failed)
+        self.heartbeat = HeartbeatMonitor(
+            config.HEARTBEAT_INTERVAL,
+            config.HEARTBEAT_TIMEOUT,
+            self._ping_controller,
+            self._controller_dead,
+        )
+
+        # connections the server drops never reach the router's cleanup
+        self.cm.on_evicted = self._connection_evicted
+
+        # grace timers of controllers that disconnected, see
+        # `controller_disconnected`
+        self._leaving: Dict[str, asyncio.TimerHandle] = {}
+
+        # last recorded (toggle, direction) per lift, so history keeps only
+        # starts, stops and direction changes
+        self._motion: Dict[LiftKey, Tuple[Any, Any]] = {}
+
+        # timing of the last e-stop, see `e_stop`
+        self.last_stop: Optional[Dict[str, Any]] = None
+        self._stop_started = 0.0
+
+        # sequence number of the last online-lifts delta sent to clients
+        self.lifts_seq = 0
+
+        # pre-serialized read views, rebuilt lazily after a change
+        self.lifts_snapshot = SnapshotCache(self._build_lifts)
+        self.lifts_flat_snapshot = SnapshotCache(self._build_lifts_flat)
+        self.lifts_message = SnapshotCache(self._build_lifts_message)
+        self.power_snapshot = SnapshotCache(lambda: self.lift_power)
+        self.power_message = SnapshotCache(
+            lambda: {"case": Case.POWER_STATES, "states": self.lift_power}
+        )
+
+        self.registry = LiftRegistry(Path("app/lift_info.json"), config.LIFT_INFO_WRITE_DELAY)
+
+    def _lift_map(
+        self,
+        con_id: str,
+        lift_ids: List[int],
+        gids: Optional[Dict[int, int]] = None,
+        persist: bool = True,
+    ) -> Dict[int, Dict[str, Any]]:
+        """Lifts of a controller keyed by its index; `gid` is the global id."""
+        lifts: Dict[int, Dict[str, Any]] = {}
+
+        for lift, gid in self.registry.bind_all(con_id, lift_ids, gids, persist).items():
+            lifts[lift] = {"id": lift, "gid": gid, "name": self.registry.name(gid) or f"Lift {gid + 1}"}
+
+        return lifts
+
+    @staticmethod
+    def _gids(lifts: Dict[int, Dict[str, Any]]) -> Dict[str, int]:
+        return {str(lift): meta["gid"] for lift, meta in lifts.items()}
+
+    def _route(self, rec: ControllerState, removed: Iterable[int] = ()) -> None:
+        """Bring the routing table in line with a controller's lifts."""
+        for lift in removed:
+            self._routes.pop((rec.con_id, lift), None)
+
+        if rec.lifts is not None and rec.worker is not None:
+            for lift in rec.lifts:
+                self._routes[(rec.con_id, lift)] = rec.worker
+
+    def _controller(self, con_id: str) -> ControllerState:
+        rec = self.controllers.get(con_id)
+
+        if rec is None:
+            rec = self.controllers[con_id] = ControllerState(con_id)
+
+        return rec
+
+    # ---------- scale-out ----------
+
+    async def start(self) -> None:
+        """Load shared controller state and start receiving other workers' events."""
+        for con_id, state in (await self.bus.load_controllers()).items():
+            rec = self._controller(con_id)
+            gids = {int(lift): gid for lift, gid in (state.get("gids") or {}).items()}
+            rec.lifts = self._lift_map(con_id, state.get("lifts") or [], gids, persist=False)
+            rec.power = state.get("power")
+            rec.worker = state.get("worker")
+            self._route(rec)
+
+        self._lifts_changed()
+        self._power_changed()
+
+        if self.events is not None:
+            await self.events.start()
+
+        await self.bus.start(self.apply_event)
+        self.heartbeat.start()
+
+    async def stop(self) -> None:
+        self.heartbeat.stop()
+
+        for timer in self._leaving.values():
+            timer.cancel()
+        self._leaving.clear()
+        await self.registry.flush()
+        await self.bus.stop()
+
+        if self.events is not None:
+            await self.events.stop()
 
-        self._lock = asyncio.Lock()
+    def _record(self, kind: str, **fields: Any) -> None:
+        if self.events is not None:
+            self.events.record(kind, **fields)
 
-        self._lift_info_path = Path("app/lift_info.json")
-        self.lift_info: Dict[str, Dict[str, Any]] = self._load_lift_info()
+    async def _store(self, rec: ControllerState) -> None:
+        """Write a controller's state to the shared store."""
+        if rec.lifts is None and rec.power is None:
+            await self.bus.save_controller(rec.con_id, None)
+            return
+
+        await self.bus.save_controller(
+            rec.con_id,
+            {
+                "lifts": sorted(rec.lifts) if rec.lifts is not None else None,
+                "gids": self._gids(rec.lifts) if rec.lifts is not None else None,
+                "power": rec.power,
+                "worker": rec.worker,
+            },
+        )
 
-    def _load_lift_info(self) -> Dict[str, Dict[str, Any]]:
-        try:
-            data = json.loads(self._lift_info_path.read_text(encoding="utf8"))
-            if not isinstance(data, dict):
-                raise ValueError("lift_info.json is not a dict")
-            return data
+    async def apply_event(self, event: Dict[str, Any]) -> None:
+        """Apply an event published by another worker."""
+        t = event.get("t")
+        origin = event["origin"]
 
-        except FileNotFoundError:
-            logger.warning("lift_info.json not found; using empty map.")
-            return {}
+        if t == "hello":
+            msg = HelloMsg(case=Case.HELLO, lifts=event["lifts"], power_state=event["power_state"])
+            gids = {int(lift): gid for lift, gid in (event.get("gids") or {}).items()}
+            await self.recv_hello(event["con_id"], msg, origin=origin, gids=gids)
 
-        except Exception as exc:
-            logger.error("Failed to read lift_info.json: %s", exc)
-            return {}
+        elif t == "gone":
+            await self.controller_disconnected(event["con_id"], origin=origin)
 
-    def _atomic_write_json(self, path: Path, data: Any) -> None:
-        tmp = path.parent / (path.name + ".tmp")
+        elif t == "power":
+            await self.update_power_state(event["con_id"], event["state"], origin=origin)
 
-        with open(tmp, "w", encoding="utf8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-            f.flush()
-            os.fsync(f.fileno())
+        elif t == "move":
+            await self.send_move_lift(MoveLiftMsg.model_validate(event["msg"]), origin=origin)
 
-        tmp.replace(path)
+        elif t == "moved":
+            await self._broadcast_lift_moved(event["obj"])
 
-    async def send_online_lifts(self, *, client_id: str = "", broadcast: bool = False) -> None:
-        async with self._lock:
-            payload = {
-                "case": Case.ONLINE_LIFTS,
-                "lifts": {
-                    con_id: {
-                        int(lid): dict(meta)
-                        for lid, meta in sorted(lifts.items(), key=lambda x: x[0])
-                    }
-                    for con_id, lifts in self.online_lifts.items()
-                }
+        elif t == "stop":
+            await self.e_stop(origin=origin)
+
+        elif t == "stop_ack":
+            await self.stop_acknowledged(event["con_id"], origin=origin)
+
+        elif t == "rename":
+            names = {int(lift_id): name for lift_id, name in event["names"].items()}
+            await self.change_names(names, origin=origin)
+
+        elif t == "move_failed":
+            await self.cm.send(event["client_id"], Frame.of(event["msg"]))
+
+        elif t == "client_gone":
+            await self.client_disconnected(event["client_id"], origin=origin)
+
+        else:
+            logger.error("Unknown backend event from %s: %s", origin, t)
+
+    # ---------- read views ----------
+
+    @property
+    def online_lifts(self) -> Dict[str, Dict[int, Dict[str, Any]]]:
+        """con_id -> lifts of every online controller (read-only)."""
+        return {
+            con_id: rec.lifts
+            for con_id, rec in self.controllers.items()
+            if rec.lifts is not None
+        }
+
+    @property
+    def lift_power(self) -> Dict[str, int]:
+        """con_id -> last known power state (read-only)."""
+        return {
+            con_id: rec.power
+            for con_id, rec in self.controllers.items()
+            if rec.power is not None
+        }
+
+    @property
+    def active_lifts(self) -> Dict[str, int]:
+        """client_id -> lift_id currently controlled (read-only)."""
+        return {cid: lift_id for cid, ((_, lift_id), _) in self._held.items()}
+
+    def is_controlling(self, client_id: str) -> bool:
+        return client_id in self._held
+
+    # ---------- snapshots ----------
+
+    def _build_lifts(self) -> Dict[str, Dict[int, Dict[str, Any]]]:
+        # lift dicts are copy-on-write, so they can be shared as-is
+        return {
+            con_id: dict(sorted(lifts.items(), key=lambda x: x[0]))
+            for con_id, lifts in self.online_lifts.items()
+        }
+
+    def _build_lifts_flat(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "con_id": con_id,
+                "lift_id": lift_id,
+                "gid": meta["gid"],
+                "name": meta["name"],
             }
+            for con_id, lifts in self.lifts_snapshot.get().value.items()
+            for lift_id, meta in lifts.items()
+        ]
+
+    def _build_lifts_message(self) -> Dict[str, Any]:
+        return {
+            "case": Case.ONLINE_LIFTS,
+            "seq": self.lifts_seq,
+            "lifts": self.lifts_snapshot.get().value,
+        }
+
+    def _lifts_changed(self) -> None:
+        self.lifts_snapshot.invalidate()
+        self.lifts_flat_snapshot.invalidate()
+        self.lifts_message.invalidate()
+
+    def _power_changed(self) -> None:
+        self.power_snapshot.invalidate()
+        self.power_message.invalidate()
 
-        message = json.dumps(payload, default=str)
+    async def send_online_lifts(self, *, client_id: str = "", broadcast: bool = False) -> None:
+        message = self.lifts_message.get().frame
 
         if broadcast and client_id == "":
-            await self.cm.broadcast_clients(message)
+            await self.cm.broadcast_clients(message, key=Case.ONLINE_LIFTS)
         else:
-            await self.cm.send(client_id, message)
+            await self.cm.send(client_id, message, key=Case.ONLINE_LIFTS)
 
-    async def send_power_states(self, *, client_id: str = "", broadcast: bool = False) -> None:
-        async with self._lock:
-            payload = {"case": Case.POWER_STATES, "states": dict(self.lift_power)}
+    async def _broadcast_lifts_delta(self, payload: Dict[str, Any]) -> None:
+        """Stamp an online-lifts delta with the next sequence number and send it.
+
+        Stamping and enqueueing happen without yielding to the event loop,
+        so sequence numbers reach every client queue in order. Deltas are
+        never coalesced: a client that misses one sees a gap and asks for
+        a fresh snapshot instead.
+        """
+        self.lifts_seq += 1
+        payload["seq"] = self.lifts_seq
+
+        # every change to online_lifts goes out as a delta
+        self._lifts_changed()
 
-        message = json.dumps(payload)
+        await self.cm.broadcast_clients(Frame.of(payload))
+
+    async def send_power_states(self, *, client_id: str = "", broadcast: bool = False) -> None:
+        message = self.power_message.get().frame
 
         if broadcast and client_id == "":
-            await self.cm.broadcast_clients(message)
+            await self.cm.broadcast_clients(message, key=Case.POWER_STATES)
         else:
-            await self.cm.send(client_id, message)
+            await self.cm.send(client_id, message, key=Case.POWER_STATES)
 
-    async def update_power_state(self, con_id: str, state: int) -> None:
+    async def update_power_state(self, con_id: str, state: int, *, origin: Optional[str] = None) -> None:
         state = 1 if int(state) == 1 else 0
 
-        async with self._lock:
-            prev = self.lift_power.get(con_id)
-            self.lift_power[con_id] = state
+        rec = self._controller(con_id)
+        prev, rec.power = rec.power, state
+
+        if origin is None:
+            await self.bus.publish({"t": "power", "con_id": con_id, "state": state})
+            await self._store(rec)
+
+            if prev != state:
+                self._record("power", con_id=con_id, state=state)
 
         if prev != state:
+            self._power_changed()
+
             await self.cm.broadcast_clients(
-                json.dumps(
+                Frame.of(
                     {
                         "case": Case.POWER_STATE,
                         "con_id": con_id,
                         "state": state,
                     }
-                )
+                ),
+                key=(Case.POWER_STATE, con_id),
+                topic=(con_id, None),
             )
 
             logger.info("Power state %s -> %s", con_id, state)
 
-    async def send_move_lift(self, data: MoveLiftMsg) -> None:
-        async with self._lock:
+    def _release(self, client_id: str) -> None:
+        held = self._held.pop(client_id, None)
 
-            if data.toggle == 0:
-                self.active_lifts.pop(data.client_id, None)
+        if held is not None and self._holders.get(held[0]) == client_id:
+            del self._holders[held[0]]
 
-            else:
-                for cid, lid in list(self.active_lifts.items()):
-                    if lid == data.lift_id and cid != data.client_id:
-                        self.active_lifts.pop(cid, None)
+    def _acquire(self, client_id: str, key: LiftKey, direction: Any = None) -> None:
+        """Hand `key` over to `client_id`, dropping any previous holder."""
+        self._release(client_id)
+
+        prev = self._holders.get(key)
+        if prev is not None and prev != client_id:
+            self._held.pop(prev, None)
 
-                self.active_lifts[data.client_id] = data.lift_id
+        self._holders[key] = client_id
+        self._held[client_id] = (key, direction)
 
-        await self.cm.send(data.con_id, data.model_dump_json())
+    async def send_move_lift(self, data: MoveLiftMsg, *, origin: Optional[str] = None) -> None:
+        key = (data.con_id, data.lift_id)
+        worker = self._routes.get(key)
 
-    async def send_lift_moved_raw(self, obj: Dict[str, Any]) -> None:
+        if data.toggle == 0:
+            self._release(data.client_id)
+
+        if worker is None:
+            # refused where it arrived, before any socket or other worker
+            if origin is None:
+                rec = self.controllers.get(data.con_id)
+                if rec is None or rec.lifts is None:
+                    _rejected_offline.inc()
+                    reason = "offline"
+                else:
+                    _rejected_unknown.inc()
+                    reason = "unknown_lift"
+
+                await self._report_move_failed(
+                    data.client_id,
+                    data.cmd_id,
+                    (data.con_id, data.lift_id, data.direction, data.toggle),
+                    reason,
+                )
+            return
+
+        if worker != self.bus.worker_id:
+            # whichever worker holds the controller's socket delivers it
+            if origin is None:
+                await self.bus.publish({"t": "move", "msg": data.model_dump()})
+                self._record_move(data)
+
+            if data.toggle != 0:
+                self._acquire(data.client_id, key, data.direction)
+            return
+
+        payload = data.model_dump(mode="json")
+        payload["cmd_id"] = cmd_id = self.commands.next_id()
+
+        if not await self.cm.send(data.con_id, Frame.of(payload)):
+            # routed here but the socket is gone, e.g. during the
+            # reconnect grace window
+            _unroutable.inc()
+            await self._report_move_failed(
+                data.client_id,
+                data.cmd_id,
+                (data.con_id, data.lift_id, data.direction, data.toggle),
+                "offline",
+            )
+            return
+
+        # only a move that went out makes the client the lift's holder
+        if data.toggle != 0:
+            self._acquire(data.client_id, key, data.direction)
+
+        self.commands.issue(
+            cmd_id,
+            data.con_id,
+            data.lift_id,
+            data.direction,
+            data.toggle,
+            data.client_id,
+            data.cmd_id,
+        )
+
+        if origin is None:
+            await self.bus.publish({"t": "move", "msg": data.model_dump()})
+            self._record_move(data)
+
+    def _record_move(self, data: MoveLiftMsg) -> None:
+        self._record(
+            "move",
+            con_id=data.con_id,
+            lift_id=data.lift_id,
+            client_id=data.client_id,
+            toggle=data.toggle,
+            direction=data.direction,
+        )
+
+    async def _move_failed(self, cmd: PendingCommand, reason: str) -> None:
+        """Tell the issuing client that a move command was not confirmed."""
+        con_id, lift_id = cmd.key[:2]
+        logger.warning("move_lift to %s lift %s failed: %s", con_id, lift_id, reason)
+
+        await self._report_move_failed(cmd.client_id, cmd.client_cmd_id, cmd.key, reason)
+
+    async def _report_move_failed(
+        self, client_id: str, client_cmd_id: Any, key: CommandKey, reason: str
+    ) -> None:
+        con_id, lift_id, direction, toggle = key
+        payload = {
+            "case": Case.MOVE_FAILED,
+            "cmd_id": client_cmd_id,
+            "con_id": con_id,
+            "lift_id": lift_id,
+            "direction": direction,
+            "toggle": toggle,
+            "reason": reason,
+        }
+
+        # rejects are routine and a client can cause any number of them
+        logger.debug("move_lift to %s lift %s failed: %s", con_id, lift_id, reason)
+        self._record("move_failed", con_id=con_id, lift_id=lift_id, client_id=client_id, reason=reason)
+
+        if not await self.cm.send(client_id, Frame.of(payload)):
+            await self.bus.publish({"t": "move_failed", "client_id": client_id, "msg": payload})
+
+    async def send_lift_moved_raw(self, obj: Dict[str, Any], con_id: Optional[str] = None) -> None:
         obj = dict(obj)
         obj["case"] = Case.LIFT_MOVED.value
 
-        await self.cm.broadcast_clients(json.dumps(obj))
+        if con_id is not None:
+            obj.setdefault("con_id", con_id)
+            self.commands.ack(con_id, obj)
+
+        # the backend's own id, meaningless to clients
+        obj.pop("cmd_id", None)
 
-    async def recv_hello(self, con_id: str, data: HelloMsg) -> None:
+        await self.telemetry.push((obj.get("con_id"), obj.get("lift_id")), obj)
+
+    async def _publish_lift_moved(self, obj: Dict[str, Any]) -> None:
+        # coalesced frames only, so other workers see the same rate
+        await self.bus.publish({"t": "moved", "obj": obj})
+        await self._broadcast_lift_moved(obj)
+
+        key = (obj.get("con_id"), obj.get("lift_id"))
+        motion = (obj.get("toggle"), obj.get("direction"))
+
+        if self._motion.get(key) != motion:
+            self._motion[key] = motion
+            self._record("moved", con_id=key[0], lift_id=key[1], toggle=motion[0], direction=motion[1])
+
+    async def _broadcast_lift_moved(self, obj: Dict[str, Any]) -> None:
+        await self.cm.broadcast_clients(
+            Frame.of(obj),
+            key=(Case.LIFT_MOVED, obj.get("con_id"), obj.get("lift_id"), obj.get("direction")),
+            topic=(obj.get("con_id"), obj.get("lift_id")),
+        )
+
+    async def recv_hello(
+        self,
+        con_id: str,
+        data: HelloMsg,
+        *,
+        origin: Optional[str] = None,
+        gids: Optional[Dict[int, int]] = None,
+    ) -> None:
+        """Register a controller's lifts; `gids` are the global ids assigned by `origin`."""
 
         changed = False
+        rec = self._controller(con_id)
 
-        async with self._lock:
+        if self._cancel_leaving(con_id):
+            _resumed.inc()
+            logger.info("Controller %s reconnected within the grace window", con_id)
 
-            self.online_lifts[con_id] = {}
+        waited = time.perf_counter()
+        async with rec.lock:
+            _lock_wait.observe(time.perf_counter() - waited)
 
-            for lift in data.lifts or []:
+            old = rec.lifts
+            lifts = self._lift_map(con_id, data.lifts or [], gids, persist=origin is None)
 
-                self.online_lifts[con_id][lift] = {"id": lift}
+            rec.lifts = lifts
+            rec.worker = origin or self.bus.worker_id
 
-                info_key = str(lift)
+            previous = old or {}
+            removed = [lid for lid in previous if lid not in lifts]
+            self._route(rec, removed)
 
-                if info_key in self.lift_info and "name" in self.lift_info[info_key]:
-                    self.online_lifts[con_id][lift]["name"] = self.lift_info[info_key]["name"]
-                else:
-                    self.online_lifts[con_id][lift]["name"] = f"Lift {lift + 1}"
+            # ---- tell clients what changed ----
+            added = {
+                lid: dict(meta)
+                for lid, meta in sorted(lifts.items())
+                if previous.get(lid) != meta
+            }
+
+            # one delta per hello: lifts that went away ride along with the
+            # added ones, so a reconnect with a new lift set is one update
+            if added or old is None:
+                delta = {"case": Case.LIFTS_ADDED, "con_id": con_id, "lifts": added}
+                if removed:
+                    delta["removed"] = removed
+
+                await self._broadcast_lifts_delta(delta)
+
+            elif removed:
+                await self._broadcast_lifts_delta(
+                    {
+                        "case": Case.LIFTS_REMOVED,
+                        "con_id": con_id,
+                        "lift_ids": removed,
+                        "offline": False,
+                    }
+                )
 
             # ---- take power state from controller ----
             if data.power_state is not None:
-                prev = self.lift_power.get(con_id)
-                self.lift_power[con_id] = 1 if int(data.power_state) == 1 else 0
-                changed = prev != self.lift_power[con_id]
+                prev = rec.power
+                rec.power = 1 if int(data.power_state) == 1 else 0
+                changed = prev != rec.power
+
+                if changed:
+                    self._power_changed()
+
+            if origin is None:
+                if old is None:
+                    self._record("online", con_id=con_id, lifts=sorted(lifts))
+                if changed:
+                    self._record("power", con_id=con_id, state=rec.power)
+
+                await self.bus.publish(
+                    {
+                        "t": "hello",
+                        "con_id": con_id,
+                        "lifts": data.lifts,
+                        "gids": self._gids(lifts),
+                        "power_state": data.power_state,
+                    }
+                )
+                await self._store(rec)
 
         # ---- Broadcast if changed ----
         if changed:
             await self.cm.broadcast_clients(
-                json.dumps(
+                Frame.of(
                     {
                         "case": Case.POWER_STATE,
                         "con_id": con_id,
-                        "state": self.lift_power[con_id],
+                        "state": rec.power,
                     }
-                )
+                ),
+                key=(Case.POWER_STATE, con_id),
+                topic=(con_id, None),
+            )
+
+    async def _ping_controller(self, con_id: str) -> None:
+        await self.cm.send(con_id, Frame.of({"case": Case.PING}))
+
+    async def _controller_dead(self, con_id: str) -> None:
+        """A controller missed its heartbeat: close it and take its lifts offline."""
+        if not await self.cm.evict(con_id):
+            await self.controller_disconnected(con_id, grace=False)
+
+    async def _connection_evicted(self, client_id: str) -> None:
+        """Clean up after a connection the server dropped (see `ConnectionManager._evict`)."""
+        if client_id.startswith("con"):
+            await self.controller_disconnected(client_id, grace=False)
+            logger.info("Controller %s evicted", client_id)
+
+        elif client_id.startswith("cli"):
+            await self.client_disconnected(client_id)
+            logger.info("Client %s evicted", client_id)
+
+    async def controller_disconnected(
+        self, con_id: str, *, origin: Optional[str] = None, grace: bool = True
+    ) -> None:
+        """Remove controller state when it disconnects.
+
+        A local disconnect only takes effect after the reconnect grace
+        window; a hello from the same controller within it cancels it, so
+        a short Wi-Fi blip is invisible to clients.
+        """
+
+        rec = self.controllers.get(con_id)
+        if rec is None:
+            return
+
+        # the controller already reconnected to another worker
+        if rec.worker is not None and rec.worker != (origin or self.bus.worker_id):
+            return
+
+        # the record itself stays, so a concurrent hello never writes
+        # into an orphaned one
+        self.telemetry.forget(con_id)
+        self.commands.forget(con_id)
+        self.heartbeat.remove(con_id)
+
+        for key in [k for k in self._motion if k[0] == con_id]:
+            del self._motion[key]
+
+        self._cancel_leaving(con_id)
+
+        if origin is None and grace and config.RECONNECT_GRACE > 0 and rec.lifts is not None:
+            loop = asyncio.get_running_loop()
+            self._leaving[con_id] = loop.call_later(
+                config.RECONNECT_GRACE,
+                lambda: asyncio.ensure_future(self._grace_expired(con_id)),
             )
+            return
+
+        await self._controller_gone(con_id, origin)
+
+    def _cancel_leaving(self, con_id: str) -> bool:
+        timer = self._leaving.pop(con_id, None)
+        if timer is None:
+            return False
+
+        timer.cancel()
+        return True
 
-        await self.send_online_lifts(broadcast=True)
+    async def _grace_expired(self, con_id: str) -> None:
+        _expired.inc()
+        await self._controller_gone(con_id)
 
-    async def controller_disconnected(self, con_id: str) -> None:
-        """Remove controller state when it disconnects."""
+    async def _controller_gone(self, con_id: str, origin: Optional[str] = None) -> None:
+        """Take a controller's lifts offline and tell clients."""
+        self._leaving.pop(con_id, None)
 
-        async with self._lock:
-            removed_lifts = self.online_lifts.pop(con_id, None)
-            self.lift_power.pop(con_id, None)
+        rec = self.controllers.get(con_id)
+        if rec is None:
+            return
+
+        if origin is None and rec.worker is not None and rec.worker != self.bus.worker_id:
+            return
+
+        waited = time.perf_counter()
+        async with rec.lock:
+            _lock_wait.observe(time.perf_counter() - waited)
+
+            removed_lifts, rec.lifts = rec.lifts, None
+            self._route(rec, removed_lifts or ())
+            had_power = rec.power is not None
+
+            if had_power:
+                rec.power = None
+                self._power_changed()
+
+            if removed_lifts is not None:
+                await self._broadcast_lifts_delta(
+                    {
+                        "case": Case.LIFTS_REMOVED,
+                        "con_id": con_id,
+                        "lift_ids": list(removed_lifts),
+                        "offline": True,
+                    }
+                )
+
+            rec.worker = None
+
+            if origin is None:
+                await self.bus.publish({"t": "gone", "con_id": con_id})
+                await self._store(rec)
+                self._record("offline", con_id=con_id)
 
         if removed_lifts:
             logger.info(
@@ -172,38 +745,164 @@ class LiftManager:
                 len(removed_lifts),
             )
 
-        await self.send_online_lifts(broadcast=True)
-        await self.send_power_states(broadcast=True)
+        if had_power:
+            await self.send_power_states(broadcast=True)
+
+    async def e_stop(self, *, origin: Optional[str] = None, client_id: Optional[str] = None) -> None:
+        """Stop every lift: controllers first, in parallel, then clients.
+
+        Controllers confirm with their own "stop" frame (see
+        `stop_acknowledged`), which gives the end-to-end latency.
+        `client_id` is the client that asked for it, if any.
+        """
+        frame = Frame.of({"case": Case.STOP})
+
+        self._holders.clear()
+        self._held.clear()
+
+        report: Dict[str, Any] = {"at": time.time(), "send_ms": {}, "ack_ms": {}}
+        self.last_stop = report
+        self._stop_started = started = time.perf_counter()
+
+        sending = self.cm.send_urgent(
+            frame, prefix="con", deadline=config.ESTOP_DEADLINE_MS / 1000
+        )
+        await self.cm.broadcast_clients(frame, urgent=True)
+
+        if origin is None:
+            await self.bus.publish({"t": "stop"})
+
+        sent = await sending
+
+        for con_id, took in sent.items():
+            if took is None:
+                metrics.estop_deadline_missed.inc()
+                report["send_ms"][con_id] = None
+            else:
+                metrics.estop_send_seconds.observe(took)
+                report["send_ms"][con_id] = round(took * 1000, 2)
+
+        missed = [con_id for con_id, took in sent.items() if took is None]
+        if missed:
+            logger.error("E-stop missed the deadline for %s; disconnected", missed)
+
+        if origin is None:
+            self._record("estop", client_id=client_id, controllers=len(sent), missed=missed)
+
+        logger.warning(
+            "E-stop sent to %d controllers in %.1f ms",
+            len(sent),
+            (time.perf_counter() - started) * 1000,
+        )
+
+    async def stop_acknowledged(self, con_id: str, *, origin: Optional[str] = None) -> None:
+        """Record a controller's confirmation of the last e-stop."""
+        if origin is None:
+            await self.bus.publish({"t": "stop_ack", "con_id": con_id})
+
+        report = self.last_stop
+
+        if report is None or con_id in report["ack_ms"]:
+            return
+
+        took = time.perf_counter() - self._stop_started
+        metrics.estop_ack_seconds.observe(took)
+        report["ack_ms"][con_id] = round(took * 1000, 2)
 
-    async def e_stop(self) -> None:
-        await self.cm.broadcast(json.dumps({"case": Case.STOP}))
+        logger.info("Controller %s confirmed STOP after %.1f ms", con_id, took * 1000)
 
-        async with self._lock:
-            self.active_lifts.clear()
-    
-    async def change_name(self, lift_id: int, new_name: str) -> None:
+    async def change_name(self, lift_id: int, new_name: str, *, origin: Optional[str] = None) -> None:
         """Change the persistent and live name of a lift and notify clients."""
+        await self.change_names({lift_id: new_name}, origin=origin)
 
-        str_id = str(lift_id)
+    async def change_names(self, names: Dict[int, str], *, origin: Optional[str] = None) -> None:
+        """Rename lifts by global id with one write to lift_info.json."""
 
-        # update persistent storage
-        self.lift_info[str_id] = {"name": new_name}
+        # the worker that got the request persists it
+        self.registry.set_names(names, persist=origin is None)
 
-        try:
-            self._atomic_write_json(self._lift_info_path, self.lift_info)
-        except Exception as exc:
-            logger.error("Failed to persist lift name: %s", exc)
+        if origin is None:
+            await self.bus.publish({"t": "rename", "names": names})
 
-        updated = False
+        # con_id -> {index: name} of the lifts that are online
+        online: Dict[str, Dict[int, str]] = {}
 
-        async with self._lock:
-            for _, lifts in self.online_lifts.items():
-                if lift_id in lifts:
-                    lifts[lift_id]["name"] = new_name
-                    updated = True
+        for gid, name in names.items():
+            ref = self.registry.resolve(gid)
+            con_id, lift = ref if ref is not None else (None, gid)
 
-        if updated:
-            logger.info("Lift %s name changed to '%s'", lift_id, new_name)
-            await self.send_online_lifts(broadcast=True)
-        else:
-            logger.warning("Lift %s not currently online", lift_id)
\ No newline at end of file
+            if origin is None:
+                self._record("rename", con_id=con_id, lift_id=lift, gid=gid, name=name)
+
+            rec = self.controllers.get(con_id) if con_id is not None else None
+
+            if rec is None or rec.lifts is None or lift not in rec.lifts:
+                logger.warning("Lift %s not currently online", gid)
+                continue
+
+            online.setdefault(con_id, {})[lift] = name
+            logger.info("Lift %s (%s/%s) name changed to '%s'", gid, con_id, lift, name)
+
+        for con_id, renamed in online.items():
+            rec = self.controllers[con_id]
+            lifts = rec.lifts
+
+            rec.lifts = {
+                **lifts,
+                **{lift: {**lifts[lift], "name": name} for lift, name in renamed.items()},
+            }
+
+            for lift, name in renamed.items():
+                await self._broadcast_lifts_delta(
+                    {
+                        "case": Case.LIFT_RENAMED,
+                        "con_id": con_id,
+                        "lift_id": lift,
+                        "gid": lifts[lift]["gid"],
+                        "name": name,
+                    }
+                )
+
+    async def client_suspended(self, client_id: str) -> None:
+        """A client dropped but may resume its session.
+
+        Others are not told yet (see `client_disconnected`, called when
+        the session expires), but a lift it was moving is stopped now:
+        that is the lift only, not an e-stop of every controller.
+        """
+        held = self._held.get(client_id)
+        if held is None:
+            return
+
+        (con_id, lift_id), direction = held
+        logger.warning("Client %s dropped while moving %s lift %s; stopping it", client_id, con_id, lift_id)
+
+        await self.send_move_lift(
+            MoveLiftMsg(
+                case=Case.MOVE_LIFT,
+                client_id=client_id,
+                con_id=con_id,
+                lift_id=lift_id,
+                toggle=0,
+                direction=direction,
+            )
+        )
+
+    async def client_disconnected(self, client_id: str, *, origin: Optional[str] = None) -> None:
+        """Stop lifts a leaving client still controls and tell the other clients."""
+
+        if origin is None:
+            if self.is_controlling(client_id):
+                await self.e_stop(client_id=client_id)
+                logger.error(
+                    "Client %s left while controlling lifts",
+                    client_id,
+                )
+
+            await self.bus.publish({"t": "client_gone", "client_id": client_id})
+
+        self._release(client_id)
+
+        await self.cm.broadcast_clients(
+            Frame.of({"case": Case.CLIENT_DISCONNECT, "client_id": client_id})
+        )
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from app.core.logging import logger
+
+# (con_id, index on that controller)
+LiftRef = Tuple[str, int]
+
+VERSION = 2
+
+# min. seconds before a failed write of lift_info.json is retried
+WRITE_RETRY = 5.0
+
+
+def _atomic_write_json(path: Path, data: Any) -> None:
+    tmp = path.parent / (path.name + ".tmp")
+
+    with open(tmp, "w", encoding="utf8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+
+    tmp.replace(path)
+
+
+class LiftRegistry:
+    """Every lift ever seen: its global id, where it lives and its name.
+
+    Controllers number their lifts from 0, so the index a controller
+    reports is only unique together with its con_id. Each (con_id, index)
+    is bound to a stable global id on first sight; both directions are
+    indexed, so lookups, renames and ownership checks are O(1).
+
+    lift_info.json holds version 2 of the format:
+
+        {"version": 2, "lifts": {"7": {"con_id": "con2", "index": 0, "name": "Bay 3"}}}
+
+    The old format (bare ids to {"name": ...}) is read as lifts that are
+    not bound yet. A controller reporting index `i` claims global id `i`
+    if that id is unbound, so single-controller setups keep their ids
+    and names. Other lifts get the next free id.
+
+    Changes are applied in memory at once; the file is rewritten `delay`
+    seconds after the first unsaved change, so a burst of changes costs a
+    single write. At most one write runs at a time.
+    """
+
+    def __init__(self, path: Path, delay: float) -> None:
+        self.path = path
+        self.delay = delay
+
+        # global id -> {"con_id", "index", "name"}; unbound lifts lack con_id
+        self._lifts: Dict[int, Dict[str, Any]] = self._load()
+        self._ids: Dict[LiftRef, int] = {
+            (lift["con_id"], lift["index"]): gid
+            for gid, lift in self._lifts.items()
+            if "con_id" in lift
+        }
+        self._next = max(self._lifts, default=-1) + 1
+
+        self._dirty = False
+        self._retry = max(delay, WRITE_RETRY)
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    def _load(self) -> Dict[int, Dict[str, Any]]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf8"))
+            if not isinstance(data, dict):
+                raise ValueError("lift_info.json is not a dict")
+
+        except FileNotFoundError:
+            logger.warning("lift_info.json not found; using empty map.")
+            return {}
+
+        except Exception as exc:
+            logger.error("Failed to read lift_info.json: %s", exc)
+            return {}
+
+        if data.get("version") == VERSION:
+            return {int(gid): dict(lift) for gid, lift in data["lifts"].items()}
+
+        logger.info("Migrating %d lift names from the old lift_info.json format", len(data))
+
+        lifts = {}
+        for gid, lift in data.items():
+            try:
+                lifts[int(gid)] = {"name": lift["name"]}
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Skipping lift_info.json entry %r", gid)
+
+        return lifts
+
+    # ---------- lookups ----------
+
+    def __len__(self) -> int:
+        return len(self._lifts)
+
+    def global_id(self, con_id: str, index: int) -> Optional[int]:
+        return self._ids.get((con_id, index))
+
+    def resolve(self, gid: int) -> Optional[LiftRef]:
+        """(con_id, index) a global id is bound to, None if unknown or unbound."""
+        lift = self._lifts.get(gid)
+        if lift is None or "con_id" not in lift:
+            return None
+        return lift["con_id"], lift["index"]
+
+    def owns(self, con_id: str, index: int) -> bool:
+        return (con_id, index) in self._ids
+
+    def name(self, gid: int) -> Optional[str]:
+        lift = self._lifts.get(gid)
+        return lift.get("name") if lift is not None else None
+
+    # ---------- changes ----------
+
+    def bind(self, con_id: str, index: int, gid: Optional[int] = None, persist: bool = True) -> int:
+        """Global id of a controller's lift, assigned on first sight.
+
+        An explicit `gid` (from the worker that assigned it) wins over
+        whatever this process had.
+        """
+        ref = (con_id, index)
+        current = self._ids.get(ref)
+
+        if gid is None:
+            if current is not None:
+                return current
+            # an old-format or renamed-ahead id matching the index is claimed
+            claimed = self._lifts.get(index)
+            gid = index if claimed is None or "con_id" not in claimed else self._next
+
+        elif current == gid:
+            return gid
+
+        if current is not None:
+            self._lifts[current].pop("con_id", None)
+            self._lifts[current].pop("index", None)
+
+        lift = self._lifts.get(gid, {})
+        if "con_id" in lift:
+            del self._ids[(lift["con_id"], lift["index"])]
+
+        self._lifts[gid] = {**lift, "con_id": con_id, "index": index}
+        self._ids[ref] = gid
+        self._next = max(self._next, gid + 1)
+
+        self._changed(persist)
+        return gid
+
+    def bind_all(
+        self,
+        con_id: str,
+        indexes: Iterable[int],
+        gids: Optional[Dict[int, int]] = None,
+        persist: bool = True,
+    ) -> Dict[int, int]:
+        """index -> global id for every lift a controller reported."""
+        gids = gids or {}
+        return {index: self.bind(con_id, index, gids.get(index), persist) for index in indexes}
+
+    def set_names(self, names: Dict[int, str], persist: bool = True) -> None:
+        """Rename lifts by global id. Unknown ids are kept for a later bind."""
+        for gid, name in names.items():
+            self._lifts[gid] = {**self._lifts.get(gid, {}), "name": name}
+            self._next = max(self._next, gid + 1)
+
+        self._changed(persist)
+
+    # ---------- persistence ----------
+
+    def _changed(self, persist: bool) -> None:
+        if not persist:
+            return
+
+        self._dirty = True
+
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write())
+        # else: the running write re-checks _dirty when it is done
+
+    async def _write(self) -> None:
+        while self._dirty:
+            self._dirty = False
+            # snapshot now; changes during the write mark it dirty again
+            data = {
+                "version": VERSION,
+                "lifts": {str(gid): dict(lift) for gid, lift in sorted(self._lifts.items())},
+            }
+
+            try:
+                await asyncio.to_thread(_atomic_write_json, self.path, data)
+            except Exception as exc:
+                logger.error("Failed to persist lift registry: %s; retrying in %.0f s", exc, self._retry)
+
+                # still unsaved: the timer tries again, as does `flush`
+                self._dirty = True
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(self._retry, self._on_timer)
+                return
+
+    async def flush(self) -> None:
+        """Write pending changes now, e.g. on shutdown."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._writer is not None and not self._writer.done():
+            await self._writer
+
+        if self._dirty:
+            self._writer = asyncio.create_task(self._write())
+            await self._writer
+
+        # a failed last write leaves a retry that would outlive shutdown
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
@@ -0,0 +1,119 @@
+from typing import Dict, FrozenSet, Generic, Hashable, Iterable, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+LiftKey = Tuple[str, int]
+Topics = Tuple[FrozenSet[str], FrozenSet[LiftKey]]
+
+
+class Subscriptions(Generic[T]):
+    """Client connections indexed by the controllers and lifts they watch.
+
+    Clients start out watching everything. `subscribe` narrows a client
+    to whole controllers and/or single lifts: an event about a lift
+    (lift_moved) then reaches clients watching that lift or its
+    controller, an event about a controller (power_state) clients
+    watching it or any of its lifts. Looking up the recipients of an
+    event only touches those clients, never the filtered-out ones.
+
+    Entries hold the connection object, so removing a connection that was
+    already replaced under the same id leaves the new one alone.
+    """
+
+    def __init__(self) -> None:
+        self.everything: Dict[str, T] = {}
+
+        self._controllers: Dict[str, Dict[str, T]] = {}
+        self._lifts: Dict[LiftKey, Dict[str, T]] = {}
+        # clients watching at least one lift of a controller
+        self._any_lift: Dict[str, Dict[str, T]] = {}
+
+        # client_id -> (connection, topics or None for everything)
+        self._clients: Dict[str, Tuple[T, Optional[Topics]]] = {}
+
+    def add(self, client_id: str, conn: T) -> None:
+        """Index a new connection; it watches everything."""
+        self._unindex(client_id)
+        self._clients[client_id] = (conn, None)
+        self.everything[client_id] = conn
+
+    def remove(self, client_id: str, conn: T) -> None:
+        entry = self._clients.get(client_id)
+
+        if entry is not None and entry[0] is conn:
+            self._unindex(client_id)
+
+    def subscribe(
+        self,
+        client_id: str,
+        conn: T,
+        controllers: Iterable[str] = (),
+        lifts: Iterable[LiftKey] = (),
+    ) -> None:
+        """Replace what `client_id` watches; nothing at all means everything."""
+        controllers = frozenset(controllers)
+        lifts = frozenset(lifts)
+
+        if not controllers and not lifts:
+            self.add(client_id, conn)
+            return
+
+        self._unindex(client_id)
+        self._clients[client_id] = (conn, (controllers, lifts))
+
+        for con_id in controllers:
+            self._controllers.setdefault(con_id, {})[client_id] = conn
+
+        for key in lifts:
+            self._lifts.setdefault(key, {})[client_id] = conn
+            self._any_lift.setdefault(key[0], {})[client_id] = conn
+
+    def topics(self, client_id: str) -> Optional[Topics]:
+        """Controllers and lifts `client_id` watches, None for everything."""
+        entry = self._clients.get(client_id)
+        return entry[1] if entry is not None else None
+
+    def watching(self, con_id: str, lift_id: Optional[int] = None) -> Iterator[T]:
+        """Connections that want an event about a lift, or a whole controller."""
+        yield from self.everything.values()
+
+        narrow = self._controllers.get(con_id)
+
+        if lift_id is None:
+            extra = self._any_lift.get(con_id)
+        else:
+            extra = self._lifts.get((con_id, lift_id))
+
+        if narrow and extra:
+            # a client may watch a controller and some of its lifts
+            narrow = {**narrow, **extra}
+        elif extra:
+            narrow = extra
+
+        if narrow:
+            yield from narrow.values()
+
+    def _unindex(self, client_id: str) -> None:
+        self.everything.pop(client_id, None)
+
+        entry = self._clients.pop(client_id, None)
+        if entry is None or entry[1] is None:
+            return
+
+        controllers, lifts = entry[1]
+
+        for con_id in controllers:
+            _discard(self._controllers, con_id, client_id)
+
+        for key in lifts:
+            _discard(self._lifts, key, client_id)
+            _discard(self._any_lift, key[0], client_id)
+
+
+def _discard(index: Dict[Hashable, Dict[str, T]], key: Hashable, client_id: str) -> None:
+    entries = index.get(key)
+
+    if entries is not None:
+        entries.pop(client_id, None)
+        if not entries:
+            del index[key]
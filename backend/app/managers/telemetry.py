@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core import metrics
+
+TelemetryKey = Tuple[Optional[str], Any]
+
+# Fields a controller may set on lift_moved to flag a safety-relevant frame
+SAFETY_FIELDS = ("stop", "limit", "limit_reached", "error")
+
+_forwarded = metrics.lift_moved_frames.labels("forwarded")
+_bypassed = metrics.lift_moved_frames.labels("bypassed")
+_merged = metrics.lift_moved_frames.labels("merged")
+_dropped = metrics.lift_moved_frames.labels("dropped")
+
+
+class TelemetryCoalescer:
+    """Rate-limits lift_moved fan-out per (con_id, lift_id).
+
+    A frame goes out at once if the lift has been quiet for a tick;
+    otherwise only the latest frame per lift is kept and flushed on the
+    next tick. Transitions (start/stop, direction change, limit or stop
+    flags) always bypass the coalescer and discard older pending frames.
+    """
+
+    def __init__(self, publish: Callable[[Dict[str, Any]], Awaitable[None]], rate_hz: float) -> None:
+        self._publish = publish
+        self.interval = 1.0 / rate_hz if rate_hz > 0 else 0.0
+
+        # last forwarded (timestamp, frame) and the pending frame per lift
+        self._last: Dict[TelemetryKey, Tuple[float, Dict[str, Any]]] = {}
+        self._pending: Dict[TelemetryKey, Dict[str, Any]] = {}
+
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _is_transition(prev: Optional[Dict[str, Any]], obj: Dict[str, Any]) -> bool:
+        if prev is None:
+            return True
+
+        if obj.get("toggle") != 1 or prev.get("toggle") != 1:
+            return True
+
+        if obj.get("direction") != prev.get("direction"):
+            return True
+
+        return any(obj.get(field) for field in SAFETY_FIELDS)
+
+    async def push(self, key: TelemetryKey, obj: Dict[str, Any]) -> None:
+        if not self.interval:
+            _forwarded.inc()
+            await self._publish(obj)
+            return
+
+        now = time.monotonic()
+        last = self._last.get(key)
+
+        if self._is_transition(last[1] if last else None, obj):
+            if self._pending.pop(key, None) is not None:
+                _dropped.inc()
+
+            _bypassed.inc()
+            await self._send(key, obj, now)
+            return
+
+        if key not in self._pending and now - last[0] >= self.interval:
+            _forwarded.inc()
+            await self._send(key, obj, now)
+            return
+
+        if key in self._pending:
+            _merged.inc()
+
+        self._pending[key] = obj
+        self._schedule()
+
+    async def _send(self, key: TelemetryKey, obj: Dict[str, Any], now: float) -> None:
+        self._last[key] = (now, obj)
+        await self._publish(obj)
+
+    def _schedule(self) -> None:
+        if self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.interval, self._on_tick)
+
+    def _on_tick(self) -> None:
+        self._timer = None
+
+        if self._pending:
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        started = time.monotonic()
+        pending, self._pending = self._pending, {}
+
+        for key, obj in pending.items():
+            # a transition for this lift went out while we were sending
+            last = self._last.get(key)
+            if last is not None and last[0] >= started:
+                _dropped.inc()
+                continue
+
+            _forwarded.inc()
+            await self._send(key, obj, started)
+
+    def forget(self, con_id: str) -> None:
+        """Drop state of a controller that went away."""
+        for key in [k for k in self._last if k[0] == con_id]:
+            del self._last[key]
+
+        for key in [k for k in self._pending if k[0] == con_id]:
+            del self._pending[key]
+            _dropped.inc()
@@ -13,8 +13,17 @@ class Case(str, Enum):
     GET_POWER_STATES = "get_power_states"
     ERROR = "error"
     ONLINE_LIFTS = "online_lifts"
+    GET_ONLINE_LIFTS = "get_online_lifts"
+    LIFTS_ADDED = "lifts_added"
+    LIFTS_REMOVED = "lifts_removed"
+    LIFT_RENAMED = "lift_renamed"
     POWER_STATES = "power_states"
     CLIENT_DISCONNECT = "client_disconnect"
+    MOVE_FAILED = "move_failed"
+    PING = "ping"
+    PONG = "pong"
+    SESSION = "session"
+    SUBSCRIBE = "subscribe"
 
 
 class BaseMsg(BaseModel):
@@ -38,6 +47,9 @@ class MoveLiftMsg(BaseMsg):
     lift_id: int = Field(ge=0)
     toggle: int = Field(ge=0, le=1)
     direction: Optional[int] = Field(default=None, ge=0, le=2)
+    # set by the client to match a later move_failed; replaced by the
+    # backend's own id on the way to the controller, which echoes it
+    cmd_id: Optional[int] = None
 
     model_config = ConfigDict(extra="allow")
 
@@ -51,6 +63,26 @@ class GetPowerStatesMsg(BaseMsg):
     case: Literal[Case.GET_POWER_STATES]
 
 
+class PongMsg(BaseMsg):
+    case: Literal[Case.PONG]
+
+
+class GetOnlineLiftsMsg(BaseMsg):
+    case: Literal[Case.GET_ONLINE_LIFTS]
+
+
+class LiftRef(BaseModel):
+    con_id: str
+    lift_id: int = Field(ge=0)
+
+
+# limits lift_moved and power_state to these; both empty means everything
+class SubscribeMsg(BaseMsg):
+    case: Literal[Case.SUBSCRIBE]
+    controllers: list[str] = Field(default_factory=list, max_length=256)
+    lifts: list[LiftRef] = Field(default_factory=list, max_length=256)
+
+
 class ErrorMsg(BaseMsg):
     case: Literal[Case.ERROR]
     detail: Any
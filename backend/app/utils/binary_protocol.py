@@ -0,0 +1,228 @@
+"""Compact binary encoding for controller links.
+
+Negotiated with the WebSocket subprotocol `smartlift.bin.v1`; without it a
+controller speaks JSON as before. Text frames stay valid on a binary link,
+so rare messages (errors) need no binary form.
+
+Every frame is one opcode byte followed by a fixed little-endian layout.
+0xFF stands for "not set" in u8 fields, 0 in cmd_id.
+
+  controller -> backend
+    0x01 hello        u8 power_state, u16 count, count * u16 lift_id
+    0x02 lift_moved   u16 lift_id, u8 direction, u8 toggle, u32 cmd_id
+    0x03 power_state  u8 state
+    0x04 stop         (ack of an e-stop)
+    0x05 pong
+
+  backend -> controller
+    0x81 move_lift    u16 lift_id, u8 direction, u8 toggle, u32 cmd_id
+    0x82 stop
+    0x83 ping
+"""
+import struct
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.models.messages import (
+    BaseMsg,
+    Case,
+    ErrorMsg,
+    HelloMsg,
+    LiftMovedMsg,
+    PongMsg,
+    PowerStateMsg,
+    StopMsg,
+)
+
+SUBPROTOCOL = "smartlift.bin.v1"
+
+UNSET = 0xFF
+
+HELLO = 0x01
+LIFT_MOVED = 0x02
+POWER_STATE = 0x03
+STOP_ACK = 0x04
+PONG = 0x05
+
+MOVE_LIFT = 0x81
+STOP = 0x82
+PING = 0x83
+
+_MOVE = struct.Struct("<BHBBI")
+_BYTE = struct.Struct("<BB")
+
+
+def _opt(value: int) -> Optional[int]:
+    return None if value == UNSET else value
+
+
+def _error(detail: str) -> ErrorMsg:
+    return ErrorMsg(case=Case.ERROR, detail=detail)
+
+
+# ---------- decoding (controller -> backend) ----------
+
+# Layouts without free-form values map to shared, prebuilt models, so no
+# pydantic code runs for them. lift_moved and hello carry lift ids and go
+# through the compiled validators, which cost less than model_construct.
+
+_validate_lift_moved = TypeAdapter(LiftMovedMsg).validate_python
+_LIFT_MOVED_CASE = Case.LIFT_MOVED.value
+_HELLO_CASE = Case.HELLO.value
+_validate_hello = TypeAdapter(HelloMsg).validate_python
+
+_POWER_STATES = {
+    state: (
+        PowerStateMsg(case=Case.POWER_STATE, state=state),
+        {"case": Case.POWER_STATE.value, "state": state},
+    )
+    for state in (0, 1)
+}
+
+
+def _lift_moved(raw: bytes) -> Tuple[BaseMsg, Dict[str, Any]]:
+    _, lift_id, direction, toggle, cmd_id = _MOVE.unpack(raw)
+    obj = {
+        "case": _LIFT_MOVED_CASE,
+        "lift_id": lift_id,
+        "direction": None if direction == UNSET else direction,
+        "toggle": toggle,
+    }
+    if cmd_id:
+        obj["cmd_id"] = cmd_id
+    return _validate_lift_moved(obj), obj
+
+
+def _power_state(raw: bytes) -> Tuple[BaseMsg, Dict[str, Any]]:
+    _, state = _BYTE.unpack(raw)
+    msg, obj = _POWER_STATES.get(state) or (None, None)
+    if msg is None:
+        raise ValueError(f"state must be 0 or 1, got {state}")
+    return msg, dict(obj)
+
+
+def _hello(raw: bytes) -> Tuple[BaseMsg, Dict[str, Any]]:
+    _, power, count = struct.unpack_from("<BBH", raw)
+    if len(raw) != 4 + 2 * count:
+        raise struct.error(f"hello announces {count} lifts in {len(raw)} bytes")
+    lifts = list(struct.unpack_from(f"<{count}H", raw, 4))
+    obj = {"case": _HELLO_CASE, "lifts": lifts, "power_state": _opt(power)}
+    return _validate_hello(obj), obj
+
+
+def _bare(case: Case, model: Type[BaseMsg]) -> Callable[[bytes], Tuple[BaseMsg, Dict[str, Any]]]:
+    msg = model(case=case)
+
+    def unpack(raw: bytes) -> Tuple[BaseMsg, Dict[str, Any]]:
+        if len(raw) != 1:
+            raise struct.error(f"{case.value} takes no payload")
+        return msg, {"case": case.value}
+    return unpack
+
+
+# opcode -> decoder returning the model and the plain dict
+_DECODERS: Dict[int, Callable[[bytes], Tuple[BaseMsg, Dict[str, Any]]]] = {
+    LIFT_MOVED: _lift_moved,
+    POWER_STATE: _power_state,
+    HELLO: _hello,
+    STOP_ACK: _bare(Case.STOP, StopMsg),
+    PONG: _bare(Case.PONG, PongMsg),
+}
+
+
+def decode(raw: bytes) -> Tuple[BaseMsg, Optional[Dict[str, Any]]]:
+    """Decode a binary controller frame; same contract as `message_parser.parse`."""
+    if not raw:
+        return _error("Malformed message: empty binary frame"), None
+
+    decoder = _DECODERS.get(raw[0])
+    if decoder is None:
+        return _error(f"Malformed message: unknown opcode {raw[0]:#04x} :: {raw.hex()}"), None
+
+    try:
+        return decoder(raw)
+    except struct.error as exc:
+        return _error(f"Malformed message: {exc} :: {raw.hex()}"), None
+    except ValidationError as ve:
+        return _error(f"Validation error: {ve.errors()} :: {raw.hex()}"), None
+    except ValueError as exc:
+        return _error(f"Validation error: {exc} :: {raw.hex()}"), None
+
+
+# ---------- encoding (backend -> controller) ----------
+
+_MOVE_LIFT_CASE = Case.MOVE_LIFT.value
+_STOP_CASE = Case.STOP.value
+_PING_CASE = Case.PING.value
+_STOP_FRAME = bytes((STOP,))
+_PING_FRAME = bytes((PING,))
+
+
+def encode(obj: Any) -> Optional[bytes]:
+    """Binary form of an outbound message, or None to send it as JSON text."""
+    if not isinstance(obj, dict):
+        return None
+
+    case = obj.get("case")
+
+    if case == _MOVE_LIFT_CASE:
+        direction = obj.get("direction")
+        try:
+            return _MOVE.pack(
+                MOVE_LIFT,
+                obj["lift_id"],
+                UNSET if direction is None else direction,
+                obj["toggle"],
+                obj.get("cmd_id") or 0,
+            )
+        except struct.error:
+            # out of the layout's range, e.g. a lift id above u16
+            return None
+
+    if case == _STOP_CASE:
+        return _STOP_FRAME
+
+    if case == _PING_CASE:
+        return _PING_FRAME
+
+    return None
+
+
+# ---------- reference encoder for controllers (tests, load tools) ----------
+
+def encode_controller(obj: Dict[str, Any]) -> bytes:
+    """Encode a controller -> backend message, as the firmware would."""
+    case = obj["case"]
+
+    if case == Case.LIFT_MOVED:
+        direction = obj.get("direction")
+        return _MOVE.pack(
+            LIFT_MOVED,
+            obj["lift_id"],
+            UNSET if direction is None else direction,
+            obj["toggle"],
+            obj.get("cmd_id") or 0,
+        )
+
+    if case == Case.POWER_STATE:
+        return _BYTE.pack(POWER_STATE, obj["state"])
+
+    if case == Case.HELLO:
+        lifts = obj.get("lifts") or []
+        power = obj.get("power_state")
+        return struct.pack(
+            f"<BBH{len(lifts)}H",
+            HELLO,
+            UNSET if power is None else power,
+            len(lifts),
+            *lifts,
+        )
+
+    if case == Case.STOP:
+        return bytes((STOP_ACK,))
+
+    if case == Case.PONG:
+        return bytes((PONG,))
+
+    raise ValueError(f"No binary form for {case!r}")
@@ -0,0 +1,91 @@
+import json
+from typing import Any, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+from app.utils import binary_protocol
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON (orjson backend)."""
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTS)
+
+    loads = orjson.loads
+
+else:
+
+    def dumps(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON (stdlib backend)."""
+        return json.dumps(
+            obj, default=str, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf8")
+
+    loads = json.loads
+
+
+# Client subprotocol: several queued messages may arrive as one JSON array.
+BATCH_SUBPROTOCOL = "smartlift.batch.v1"
+
+
+class Frame:
+    """An outbound message, encoded once and shared by every recipient.
+
+    ASGI text frames must be `str`, so the decoded text is cached next to
+    the UTF-8 bytes; whichever form a transport needs is computed at most
+    once per fan-out instead of once per socket. The binary form sent to
+    controllers that negotiated it is packed by `of` straight from the
+    message dict; other frames have none.
+    """
+
+    __slots__ = ("_data", "_text", "_binary")
+
+    def __init__(
+        self,
+        data: Optional[bytes] = None,
+        text: Optional[str] = None,
+        binary: Optional[bytes] = None,
+    ) -> None:
+        if data is None and text is None:
+            raise ValueError("Frame needs data or text")
+
+        self._data = data
+        self._text = text
+        self._binary = binary
+
+    @classmethod
+    def of(cls, obj: Any) -> "Frame":
+        """Encode a JSON-serializable object."""
+        return cls(data=dumps(obj), binary=binary_protocol.encode(obj))
+
+    @classmethod
+    def batch(cls, frames: Sequence["Frame"]) -> "Frame":
+        """Join encoded frames into one JSON array without re-encoding."""
+        return cls(data=b"[" + b",".join(frame.data for frame in frames) + b"]")
+
+    @property
+    def data(self) -> bytes:
+        if self._data is None:
+            self._data = self._text.encode("utf8")
+        return self._data
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._data.decode("utf8")
+        return self._text
+
+    @property
+    def binary(self) -> Optional[bytes]:
+        """Compact binary encoding, None if the message has none."""
+        return self._binary
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"Frame({self.text!r})"
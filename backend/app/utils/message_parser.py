@@ -1,5 +1,5 @@
-import json
-from pydantic import ValidationError
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union
+from pydantic import TypeAdapter, ValidationError
 
 from app.models.messages import (
     Case,
@@ -9,48 +9,75 @@ from app.models.messages import (
     MoveLiftMsg,
     PowerStateMsg,
     GetPowerStatesMsg,
+    GetOnlineLiftsMsg,
+    SubscribeMsg,
+    PongMsg,
     ErrorMsg,
     LiftMovedMsg,
 )
+from app.utils.frames import loads
 
 
-def parse_msg(raw: str) -> BaseMsg:
-    """Parse inbound JSON into a typed model; be liberal for lift_moved."""
+# Inbound message type per case
+MODELS: Dict[Case, Type[BaseMsg]] = {
+    Case.HELLO: HelloMsg,
+    Case.STOP: StopMsg,
+    Case.MOVE_LIFT: MoveLiftMsg,
+    Case.POWER_STATE: PowerStateMsg,
+    Case.GET_POWER_STATES: GetPowerStatesMsg,
+    Case.GET_ONLINE_LIFTS: GetOnlineLiftsMsg,
+    Case.SUBSCRIBE: SubscribeMsg,
+    Case.PONG: PongMsg,
+    Case.ERROR: ErrorMsg,
+    Case.LIFT_MOVED: LiftMovedMsg,
+}
 
-    try:
-        obj = json.loads(raw)
+# Dispatch table keyed by the raw "case" string, so no Case() lookup and no
+# if-chain runs per frame. Adapters are built once at import time.
+_VALIDATORS: Dict[str, Callable[[Any], BaseMsg]] = {
+    case.value: TypeAdapter(model).validate_python for case, model in MODELS.items()
+}
 
-        if not isinstance(obj, dict) or "case" not in obj:
-            raise ValueError("Missing 'case'")
 
-        c = Case(obj["case"])
+def _error(detail: str) -> ErrorMsg:
+    return ErrorMsg(case=Case.ERROR, detail=detail)
 
-    except Exception as exc:
-        return ErrorMsg(case=Case.ERROR, detail=f"Malformed message: {exc} :: {raw}")
+
+def parse(raw: Union[str, bytes]) -> Tuple[BaseMsg, Optional[Dict[str, Any]]]:
+    """Decode and validate an inbound frame exactly once.
+
+    Returns the typed model together with the decoded dict, so handlers
+    that forward the payload (e.g. lift_moved) never decode it again.
+    The dict is None if decoding failed.
+    """
 
     try:
-        if c is Case.HELLO:
-            return HelloMsg(**obj)
+        obj = loads(raw)
 
-        if c is Case.STOP:
-            return StopMsg(**obj)
+        if not isinstance(obj, dict) or "case" not in obj:
+            raise ValueError("Missing 'case'")
 
-        if c is Case.MOVE_LIFT:
-            return MoveLiftMsg(**obj)
+    except Exception as exc:
+        return _error(f"Malformed message: {exc} :: {raw}"), None
 
-        if c is Case.POWER_STATE:
-            return PowerStateMsg(**obj)
+    case = obj["case"]
+    if not isinstance(case, str):
+        return _error(f"Malformed message: {case!r} is not a valid Case :: {raw}"), obj
 
-        if c is Case.GET_POWER_STATES:
-            return GetPowerStatesMsg(**obj)
+    validate = _VALIDATORS.get(case)
 
-        if c is Case.ERROR:
-            return ErrorMsg(**obj)
+    if validate is None:
+        if case in Case._value2member_map_:
+            return _error(f"Unsupported case: {obj}"), obj
+        return _error(f"Malformed message: {case!r} is not a valid Case :: {raw}"), obj
 
-        if c is Case.LIFT_MOVED:
-            return LiftMovedMsg(**obj)
+    try:
+        return validate(obj), obj
 
     except ValidationError as ve:
-        return ErrorMsg(case=Case.ERROR, detail=f"Validation error: {ve.errors()} :: {obj}")
+        return _error(f"Validation error: {ve.errors()} :: {obj}"), obj
+
 
-    return ErrorMsg(case=Case.ERROR, detail=f"Unsupported case: {obj}")
\ No newline at end of file
+def parse_msg(raw: Union[str, bytes]) -> BaseMsg:
+    """Parse inbound JSON into a typed model; be liberal for lift_moved."""
+    return parse(raw)[0]
@@ -0,0 +1,56 @@
+import hashlib
+from typing import Any, Callable, Optional
+
+from app.utils.frames import Frame
+
+
+class Snapshot:
+    """Immutable, pre-serialized view of some state.
+
+    `value` is shared by every reader and must not be mutated.
+    """
+
+    __slots__ = ("generation", "value", "frame", "etag")
+
+    def __init__(self, generation: int, value: Any) -> None:
+        self.generation = generation
+        self.value = value
+        self.frame = Frame.of(value)
+        # content hash, so ETags stay valid across restarts
+        self.etag = '"%s"' % hashlib.blake2b(self.frame.data, digest_size=8).hexdigest()
+
+    @property
+    def data(self) -> bytes:
+        return self.frame.data
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if an `If-None-Match` header names this snapshot."""
+        if not if_none_match:
+            return False
+
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+
+        return False
+
+
+class SnapshotCache:
+    """Rebuilds a snapshot only after the state it mirrors was invalidated."""
+
+    def __init__(self, build: Callable[[], Any]) -> None:
+        self._build = build
+        self._snapshot: Optional[Snapshot] = None
+        self.generation = 0
+
+    def invalidate(self) -> None:
+        self.generation += 1
+
+    def get(self) -> Snapshot:
+        snapshot = self._snapshot
+
+        if snapshot is None or snapshot.generation != self.generation:
+            snapshot = self._snapshot = Snapshot(self.generation, self._build())
+
+        return snapshot
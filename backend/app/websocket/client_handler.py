@@ -1,21 +1,32 @@
+import time
+
 from app.websocket.client_routes import router
 from app.models.messages import ErrorMsg
 from app.utils.message_parser import parse_msg
 from app.core.logging import logger
+from app.core import metrics
 from app.core.state import lm
 
+_parse_time = metrics.ws_parse_seconds.labels("client")
+_handler_time = metrics.per_case(metrics.ws_handler_seconds, "client")
+
 
-async def handler(websocket, client_id):
+async def handler(websocket, client_id, resumed=False):
 
     logger.info("Client %s connected", client_id)
 
-    await lm.send_online_lifts(client_id=client_id)
-    await lm.send_power_states(client_id=client_id)
+    # a resumed session replays what the client missed instead
+    if not resumed:
+        await lm.send_online_lifts(client_id=client_id)
+        await lm.send_power_states(client_id=client_id)
 
     while True:
 
         raw = await websocket.receive_text()
+
+        started = time.perf_counter()
         msg = parse_msg(raw)
+        _parse_time.observe(time.perf_counter() - started)
 
         logger.debug("Client %s sent: %s", client_id, raw)
 
@@ -26,4 +37,6 @@ async def handler(websocket, client_id):
         h = router.get(msg)
 
         if h:
+            started = time.perf_counter()
             await h(msg, client_id)
+            _handler_time[msg.case.value].observe(time.perf_counter() - started)
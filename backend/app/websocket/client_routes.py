@@ -3,14 +3,16 @@ from app.models.messages import (
     StopMsg,
     MoveLiftMsg,
     GetPowerStatesMsg,
+    GetOnlineLiftsMsg,
+    SubscribeMsg,
 )
-from app.core.state import lm
+from app.core.state import cm, lm
 
 router = MessageRouter()
 
 
 async def handle_stop(msg, client_id):
-    await lm.e_stop()
+    await lm.e_stop(client_id=client_id)
 
 
 async def handle_move_lift(msg, client_id):
@@ -22,6 +24,20 @@ async def handle_get_power(msg, client_id):
     await lm.send_power_states(client_id=client_id)
 
 
+async def handle_get_online_lifts(msg, client_id):
+    await lm.send_online_lifts(client_id=client_id)
+
+
+async def handle_subscribe(msg, client_id):
+    cm.subscribe(
+        client_id,
+        controllers=msg.controllers,
+        lifts=[(lift.con_id, lift.lift_id) for lift in msg.lifts],
+    )
+
+
 router.register(StopMsg, handle_stop)
 router.register(MoveLiftMsg, handle_move_lift)
-router.register(GetPowerStatesMsg, handle_get_power)
\ No newline at end of file
+router.register(GetPowerStatesMsg, handle_get_power)
+router.register(GetOnlineLiftsMsg, handle_get_online_lifts)
+router.register(SubscribeMsg, handle_subscribe)
\ No newline at end of file
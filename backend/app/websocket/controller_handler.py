@@ -1,18 +1,41 @@
-from fastapi import WebSocket
+import time
 
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.core import metrics
 from app.core.logging import logger
+from app.core.state import lm
 from app.models.messages import ErrorMsg
-from app.utils.message_parser import parse_msg
+from app.utils import binary_protocol
+from app.utils.message_parser import parse
 from app.websocket.controller_routes import router
 
+_parse_time = metrics.ws_parse_seconds.labels("controller")
+_handler_time = metrics.per_case(metrics.ws_handler_seconds, "controller")
+
 
 async def handler(websocket: WebSocket, con_id: str) -> None:
     """Handle 'con*' connections."""
 
+    lm.heartbeat.add(con_id)
+
     while True:
 
-        raw = await websocket.receive_text()
-        msg = parse_msg(raw)
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+
+        lm.heartbeat.touch(con_id)
+
+        # binary frames carry the compact protocol (see binary_protocol)
+        started = time.perf_counter()
+        raw = message.get("text")
+        if raw is None:
+            raw = message.get("bytes") or b""
+            msg, obj = binary_protocol.decode(raw)
+        else:
+            msg, obj = parse(raw)
+        _parse_time.observe(time.perf_counter() - started)
 
         logger.debug("Controller %s sent: %s", con_id, raw)
 
@@ -23,7 +46,9 @@ async def handler(websocket: WebSocket, con_id: str) -> None:
         h = router.get(msg)
 
         if h:
-            await h(msg, con_id, raw)
+            started = time.perf_counter()
+            await h(msg, con_id, obj)
+            _handler_time[msg.case.value].observe(time.perf_counter() - started)
         else:
             logger.error(
                 "Controller %s sent unsupported case: %s",
@@ -0,0 +1,51 @@
+"""uvicorn WebSocket protocol that compresses client links only.
+
+uvicorn offers permessage-deflate to every peer with fixed settings. Here
+it is offered to `cli*` connections only, tuned by the SMARTLIFT_WS_DEFLATE_*
+settings; controllers never get it, the ESP has no RAM to spare for zlib.
+
+    uvicorn app.main:app --ws app.websocket.protocol:WebSocketProtocol
+"""
+from typing import List
+
+from uvicorn.protocols.websockets.websockets_sansio_impl import WebSocketsSansIOProtocol
+from websockets.extensions.base import ServerExtensionFactory
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
+from websockets.http11 import Request
+
+from app.core import config
+
+
+def _client_extensions() -> List[ServerExtensionFactory]:
+    if config.WS_DEFLATE_LEVEL <= 0:
+        return []
+
+    bits = config.WS_DEFLATE_WINDOW_BITS
+    return [
+        ServerPerMessageDeflateFactory(
+            server_max_window_bits=bits,
+            client_max_window_bits=bits,
+            compress_settings={
+                "level": config.WS_DEFLATE_LEVEL,
+                "memLevel": config.WS_DEFLATE_MEM_LEVEL,
+            },
+        )
+    ]
+
+
+# factories hold settings only; each connection gets its own zlib state
+_CLIENT_EXTENSIONS = _client_extensions()
+
+
+def is_client_path(path: str) -> bool:
+    """True for `/ws/cli*`, whatever prefix the proxy or root_path adds."""
+    return path.partition("?")[0].rsplit("/", 1)[-1].startswith("cli")
+
+
+class WebSocketProtocol(WebSocketsSansIOProtocol):
+    def handle_connect(self, event: Request) -> None:
+        # extensions are negotiated by conn.accept() in the base handler
+        self.conn.available_extensions = (
+            _CLIENT_EXTENSIONS if is_client_path(event.path) else []
+        )
+        super().handle_connect(event)
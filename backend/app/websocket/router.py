@@ -1,8 +1,10 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import json
 
+from app.core import config
 from app.core.logging import logger
 from app.core.state import cm, lm
+from app.utils.binary_protocol import SUBPROTOCOL
+from app.utils.frames import BATCH_SUBPROTOCOL
 
 
 router = APIRouter()
@@ -12,7 +14,35 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
 
     from app.websocket import client_handler, controller_handler
 
-    await cm.connect(client_id, websocket)
+    # controllers may opt into the compact binary protocol, clients into
+    # batched frames
+    offered = websocket.scope.get("subprotocols", ())
+    subprotocol = None
+    if client_id.startswith("con") and SUBPROTOCOL in offered:
+        subprotocol = SUBPROTOCOL
+    elif client_id.startswith("cli") and BATCH_SUBPROTOCOL in offered and config.WS_BATCH_MAX > 1:
+        subprotocol = BATCH_SUBPROTOCOL
+
+    # clients opt into resumable sessions with ?session=<token or empty>
+    params = websocket.query_params
+    resumable = (
+        client_id.startswith("cli") and "session" in params and config.CLIENT_RESUME_GRACE > 0
+    )
+    resumed = False
+
+    if resumable and params["session"]:
+        try:
+            ack = int(params.get("ack", 0))
+        except ValueError:
+            ack = -1
+        resumed = await cm.resume(client_id, websocket, params["session"], ack, subprotocol)
+
+    if not resumed:
+        # a session that cannot be resumed ends now, as a plain disconnect would have
+        if await cm.end_session(client_id):
+            await lm.client_disconnected(client_id)
+
+        await cm.connect(client_id, websocket, subprotocol, resumable=resumable)
 
     try:
 
@@ -20,7 +50,7 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
             await controller_handler.handler(websocket, client_id)
 
         elif client_id.startswith("cli"):
-            await client_handler.handler(websocket, client_id)
+            await client_handler.handler(websocket, client_id, resumed=resumed)
 
         else:
             logger.error("Unknown peer connected: %s", client_id)
@@ -31,26 +61,27 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
 
     except WebSocketDisconnect:
 
-        await cm.disconnect(client_id, websocket)
+        if resumable and await cm.suspend(
+            client_id, websocket, config.CLIENT_RESUME_GRACE, _client_gone
+        ):
+            logger.info("Client %s dropped; keeping its session", client_id)
+            await lm.client_suspended(client_id)
+            return
+
+        # replaced by a reconnect, whose socket now owns the state, or
+        # evicted, which already cleaned up (see LiftManager._connection_evicted)
+        if not await cm.disconnect(client_id, websocket):
+            return
 
         if client_id.startswith("con"):
             await lm.controller_disconnected(client_id)
             logger.info("Controller %s left", client_id)
 
         elif client_id.startswith("cli"):
+            await lm.client_disconnected(client_id)
+            logger.info("Client %s left", client_id)
 
-            message = {
-                "case": "client_disconnect",
-                "client_id": client_id,
-            }
-
-            if client_id in lm.active_lifts:
-                await lm.e_stop()
-                logger.error(
-                    "Client %s left while controlling lifts",
-                    client_id,
-                )
-
-            await cm.broadcast_clients(json.dumps(message))
 
-            logger.info("Client %s left", client_id)
\ No newline at end of file
+async def _client_gone(client_id: str) -> None:
+    await lm.client_disconnected(client_id)
+    logger.info("Client %s left (session expired)", client_id)
@@ -0,0 +1,111 @@
+"""Per-broadcast CPU cost of the original broadcast loop vs. queued Frames.
+
+"legacy" is the loop the ConnectionManager started with: json.dumps once,
+then await send_text on every socket in turn. "queued" is the current
+path: one Frame queued to every connection and sent by its writer task.
+Sinks never block, so this is CPU only; what the queues buy, a slow
+socket no longer stalling the others, does not show up here.
+
+Both hand each socket a str, which the ASGI server UTF-8 encodes per
+socket (SinkSocket does the same); a Frame shares its encoding within the
+backend, not the bytes on the wire.
+
+    python -m benchmarks.broadcast [--rounds 200]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from app.managers.connection_manager import ConnectionManager
+from app.models.messages import Case
+from app.utils import frames
+from app.utils.frames import Frame
+
+from benchmarks.common import SinkSocket
+
+CLIENT_COUNTS = (10, 100, 1000)
+
+
+class Countdown:
+    def __init__(self) -> None:
+        self.left = 0
+        self.event = asyncio.Event()
+
+    def arm(self, n: int) -> None:
+        self.left = n
+        self.event.clear()
+
+    def tick(self) -> None:
+        self.left -= 1
+        if self.left == 0:
+            self.event.set()
+
+
+def payloads():
+    snapshot = {
+        "case": Case.ONLINE_LIFTS,
+        "lifts": {
+            f"con{c}": {i: {"id": i, "name": f"Lift {i + 1}"} for i in range(c * 5, c * 5 + 5)}
+            for c in range(10)
+        },
+    }
+    moved = {"case": Case.LIFT_MOVED.value, "lift_id": 3, "direction": 1, "toggle": 1}
+    return {"lift_moved": moved, "online_lifts": snapshot}
+
+
+async def run_legacy(n: int, payload, rounds: int) -> float:
+    """Average CPU seconds per broadcast of the original sequential loop."""
+    lock = asyncio.Lock()
+    connections = {f"cli{i}": SinkSocket() for i in range(n)}
+
+    start = time.process_time()
+    for _ in range(rounds):
+        message = json.dumps(payload, default=str)
+
+        async with lock:
+            items = [(cid, ws) for cid, ws in connections.items() if cid.startswith("cli")]
+
+        for cid, ws in items:
+            try:
+                await ws.send_text(message)
+            except Exception:
+                pass
+    return (time.process_time() - start) / rounds
+
+
+async def run(n: int, payload, rounds: int) -> float:
+    """Average CPU seconds per broadcast, including the writers draining it."""
+    done = Countdown()
+    cm = ConnectionManager(queue_size=rounds + 1)
+    for i in range(n):
+        await cm.connect(f"cli{i}", SinkSocket(done.tick))
+
+    start = time.process_time()
+    for _ in range(rounds):
+        done.arm(n)
+        await cm.broadcast_clients(Frame.of(payload))
+        await done.event.wait()
+    elapsed = (time.process_time() - start) / rounds
+
+    for i in range(n):
+        await cm.disconnect(f"cli{i}")
+    return elapsed
+
+
+async def main(rounds: int) -> None:
+    backend = "orjson" if frames.orjson is not None else "json"
+    print(f"JSON backend: {backend}, {rounds} rounds\n")
+    print(f"{'payload':<14}{'clients':>8}{'legacy µs':>12}{'queued µs':>12}{'speedup':>9}")
+
+    for name, payload in payloads().items():
+        for n in CLIENT_COUNTS:
+            old = await run_legacy(n, payload, rounds)
+            new = await run(n, payload, rounds)
+            print(f"{name:<14}{n:>8}{old * 1e6:>12.1f}{new * 1e6:>12.1f}{old / new:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=200)
+    asyncio.run(main(parser.parse_args().rounds))
@@ -0,0 +1,36 @@
+from typing import Callable, List, Optional, Sequence
+
+
+class SinkSocket:
+    """WebSocket stand-in that accepts and counts every frame.
+
+    Like the ASGI server, it UTF-8 encodes text frames on send; `on_send`
+    is called after each one.
+    """
+
+    def __init__(self, on_send: Optional[Callable[[], None]] = None) -> None:
+        self.sent = 0
+        self.on_send = on_send
+
+    async def accept(self, subprotocol=None) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def send_text(self, text: str) -> None:
+        text.encode("utf8")
+        self.sent += 1
+
+        if self.on_send is not None:
+            self.on_send()
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile, 0 for an empty sample."""
+    if not values:
+        return 0.0
+
+    ordered: List[float] = sorted(values)
+    rank = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
@@ -0,0 +1,100 @@
+"""Move-command latency in LiftManager while controllers storm it with hellos.
+
+    python -m benchmarks.contention [--controllers 50] [--lifts 40] [--clients 100]
+"""
+import argparse
+import asyncio
+import time
+
+from app.core import config
+from app.managers.connection_manager import ConnectionManager
+from app.managers.lift_manager import LiftManager
+from app.models.messages import Case, HelloMsg, MoveLiftMsg
+
+from benchmarks.common import SinkSocket, percentile
+
+
+async def hello_storm(lm: LiftManager, con_id: str, lifts: int, stop: asyncio.Event, counter: list) -> None:
+    flip = 0
+
+    while not stop.is_set():
+        # a spare lift comes and goes, so every hello produces deltas while
+        # the lifts the movers use stay online
+        ids = list(range(lifts + flip))
+        await lm.recv_hello(con_id, HelloMsg(case=Case.HELLO, lifts=ids, power_state=flip))
+        counter[0] += 1
+
+        flip ^= 1
+        await asyncio.sleep(0)
+
+
+async def mover(
+    lm: LiftManager, client_id: str, controllers: int, lifts: int, stop: asyncio.Event, samples: list
+) -> None:
+    n = 0
+
+    while not stop.is_set():
+        msg = MoveLiftMsg(
+            case=Case.MOVE_LIFT,
+            client_id=client_id,
+            con_id=f"con{n % controllers}",
+            lift_id=n % lifts,
+            toggle=n % 2,
+            direction=0,
+        )
+
+        start = time.perf_counter()
+        await lm.send_move_lift(msg)
+        samples.append(time.perf_counter() - start)
+
+        n += 1
+        await asyncio.sleep(0)
+
+
+async def main(controllers: int, lifts: int, clients: int, movers: int, seconds: float) -> None:
+    # the sinks never answer a move, so there is nothing to wait for
+    config.MOVE_ACK_TIMEOUT_MS = 0
+
+    cm = ConnectionManager(queue_size=10_000)
+    lm = LiftManager(cm)
+
+    # moves go to lifts that are online, not to the reject path
+    for i in range(controllers):
+        await cm.connect(f"con{i}", SinkSocket())
+        await lm.recv_hello(f"con{i}", HelloMsg(case=Case.HELLO, lifts=list(range(lifts))))
+    for i in range(clients):
+        await cm.connect(f"cli{i}", SinkSocket())
+
+    stop = asyncio.Event()
+    hellos = [0]
+    samples: list = []
+
+    tasks = [
+        asyncio.create_task(hello_storm(lm, f"con{i}", lifts, stop, hellos))
+        for i in range(controllers)
+    ] + [
+        asyncio.create_task(mover(lm, f"cli{i}", controllers, lifts, stop, samples))
+        for i in range(movers)
+    ]
+
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+
+    print(f"{controllers} controllers x {lifts} lifts, {clients} clients, {movers} movers, {seconds:.0f}s")
+    print(f"hellos/s        {hellos[0] / seconds:>10.0f}")
+    print(f"moves/s         {len(samples) / seconds:>10.0f}")
+    print(f"move p50 µs     {percentile(samples, 50) * 1e6:>10.1f}")
+    print(f"move p99 µs     {percentile(samples, 99) * 1e6:>10.1f}")
+    print(f"move max µs     {max(samples, default=0) * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--controllers", type=int, default=50)
+    parser.add_argument("--lifts", type=int, default=40)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--movers", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.controllers, args.lifts, args.clients, args.movers, args.seconds))
@@ -0,0 +1,340 @@
+"""End-to-end load test: fake controllers and clients against the real app.
+
+    python -m benchmarks.loadtest [--controllers 20] [--lifts 8] [--clients 200]
+                                  [--movers 20] [--seconds 10] [--out run.json]
+    python -m benchmarks.loadtest --url ws://localhost:8000/api ...
+
+Without --url the app from app.main is served by uvicorn in this process,
+so the load generator and the server share one CPU and one event loop.
+Its lift registry and event history then live in a temporary directory.
+
+Every move_lift carries a `sent` timestamp. Controllers echo it back in
+their lift_moved, which gives command-to-controller latency (move_lift
+received by the controller) and broadcast latency (lift_moved received by
+each client). All clocks are local, so --url must point at this host.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import websockets
+
+from benchmarks.common import percentile
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.command: List[float] = []
+        self.broadcast: List[float] = []
+        self.stop: List[float] = []
+        self.sent: Dict[str, int] = {}
+        self.received: Dict[str, int] = {}
+        self.stop_sent_at: Optional[float] = None
+
+    def count(self, table: Dict[str, int], case: str) -> None:
+        table[case] = table.get(case, 0) + 1
+
+
+async def controller(url: str, con_id: str, lifts: List[int], stats: Stats, stop: asyncio.Event) -> None:
+    async with websockets.connect(f"{url}/ws/{con_id}", max_queue=None) as ws:
+
+        async def send(obj: Dict[str, Any]) -> None:
+            stats.count(stats.sent, obj["case"])
+            await ws.send(json.dumps(obj))
+
+        await send({"case": "hello", "lifts": lifts, "power_state": 1})
+
+        async def power() -> None:
+            state = 1
+            while not stop.is_set():
+                await asyncio.sleep(1.0)
+                state ^= 1
+                await send({"case": "power_state", "state": state})
+
+        ticker = asyncio.create_task(power())
+
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                case = msg.get("case")
+                stats.count(stats.received, case)
+
+                if case == "move_lift":
+                    if "sent" in msg:
+                        stats.command.append(time.perf_counter() - msg["sent"])
+
+                    await send(
+                        {
+                            "case": "lift_moved",
+                            "lift_id": msg["lift_id"],
+                            "toggle": msg["toggle"],
+                            "direction": msg.get("direction"),
+                            "sent": msg.get("sent"),
+                        }
+                    )
+
+                elif case == "stop":
+                    if stats.stop_sent_at is not None:
+                        stats.stop.append(time.perf_counter() - stats.stop_sent_at)
+                    await send({"case": "stop"})
+        finally:
+            ticker.cancel()
+
+
+async def client(
+    url: str, client_id: str, targets: List[tuple], rate: float, stats: Stats, stop: asyncio.Event
+) -> None:
+    async with websockets.connect(f"{url}/ws/{client_id}", max_queue=None) as ws:
+
+        async def send(obj: Dict[str, Any]) -> None:
+            stats.count(stats.sent, obj["case"])
+            await ws.send(json.dumps(obj))
+
+        async def reader() -> None:
+            async for raw in ws:
+                msg = json.loads(raw)
+                stats.count(stats.received, msg.get("case"))
+
+                if msg.get("case") == "lift_moved" and msg.get("sent"):
+                    stats.broadcast.append(time.perf_counter() - msg["sent"])
+
+        task = asyncio.create_task(reader())
+
+        try:
+            if targets:
+                con_id, lift_id = random.choice(targets)
+                toggle = 0
+
+                while not stop.is_set():
+                    toggle ^= 1
+                    await send(
+                        {
+                            "case": "move_lift",
+                            "client_id": client_id,
+                            "con_id": con_id,
+                            "lift_id": lift_id,
+                            "toggle": toggle,
+                            "direction": 1,
+                            "sent": time.perf_counter(),
+                        }
+                    )
+                    await asyncio.sleep(1.0 / rate)
+
+                # release the lift, leaving while controlling triggers an e-stop
+                if toggle:
+                    await send(
+                        {
+                            "case": "move_lift",
+                            "client_id": client_id,
+                            "con_id": con_id,
+                            "lift_id": lift_id,
+                            "toggle": 0,
+                            "direction": 1,
+                        }
+                    )
+            else:
+                await stop.wait()
+
+            await asyncio.sleep(0.5)
+        finally:
+            task.cancel()
+
+
+def server_rss(http_url: str) -> Optional[float]:
+    """process_resident_memory_bytes from the server's /metrics, if exposed."""
+    try:
+        with urllib.request.urlopen(f"{http_url}/metrics", timeout=5) as resp:
+            body = resp.read().decode()
+    except OSError:
+        return None
+
+    for line in body.splitlines():
+        if line.startswith("process_resident_memory_bytes "):
+            return float(line.split()[1])
+
+    return None
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def start_server(port: int, scratch: str):
+    """Serve app.main in this process, with its lift registry and history in `scratch`."""
+    import uvicorn
+
+    # the fake controllers must not end up in the real lift_info.json or events.db
+    os.environ["SMARTLIFT_EVENT_DB_PATH"] = os.path.join(scratch, "events.db")
+
+    from app.core import config, state
+    from app.main import app
+    from app.managers.lift_registry import LiftRegistry
+
+    state.lm.registry = LiftRegistry(Path(scratch) / "lift_info.json", config.LIFT_INFO_WRITE_DELAY)
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+            lifespan="on",
+            ws="app.websocket.protocol:WebSocketProtocol",
+        )
+    )
+    task = asyncio.create_task(server.serve())
+
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    return server, task
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1e3, 3),
+        "p99_ms": round(percentile(samples, 99) * 1e3, 3),
+        "max_ms": round(max(samples, default=0) * 1e3, 3),
+    }
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    server = None
+    scratch = None
+
+    if args.url:
+        url = args.url.rstrip("/")
+    else:
+        port = free_port()
+        scratch = tempfile.TemporaryDirectory(prefix="smartlift-loadtest-")
+        server, server_task = await start_server(port, scratch.name)
+        url = f"ws://127.0.0.1:{port}"
+
+    # /metrics is mounted outside the /api root path
+    http_url = url.replace("ws", "http", 1)
+    if http_url.endswith("/api"):
+        http_url = http_url[: -len("/api")]
+
+    stats = Stats()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    rss_before = await loop.run_in_executor(None, server_rss, http_url)
+
+    plan = {
+        f"con{i}": list(range(i * args.lifts, (i + 1) * args.lifts))
+        for i in range(args.controllers)
+    }
+    targets = [(con_id, lift) for con_id, lifts in plan.items() for lift in lifts]
+
+    tasks = [
+        asyncio.create_task(controller(url, con_id, lifts, stats, stop))
+        for con_id, lifts in plan.items()
+    ]
+    await asyncio.sleep(0.5)
+
+    tasks += [
+        asyncio.create_task(
+            client(url, f"cli{i}", targets if i < args.movers else [], args.rate, stats, stop)
+        )
+        for i in range(args.clients)
+    ]
+    await asyncio.sleep(1.0)
+
+    rss_connected = await loop.run_in_executor(None, server_rss, http_url)
+
+    started = time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    elapsed = time.perf_counter() - started
+
+    # one e-stop at the end, timed until each controller sees it
+    async with websockets.connect(f"{url}/ws/cli-estop") as ws:
+        stats.stop_sent_at = time.perf_counter()
+        await ws.send(json.dumps({"case": "stop"}))
+        await asyncio.sleep(1.0)
+
+    stop.set()
+    await asyncio.sleep(1.0)
+
+    for task in tasks:
+        task.cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    errors = [
+        repr(r) for r in results
+        if isinstance(r, BaseException) and not isinstance(r, asyncio.CancelledError)
+    ]
+
+    if server is not None:
+        server.should_exit = True
+        await server_task
+        scratch.cleanup()
+
+    connections = args.controllers + args.clients
+    rss_per_conn = None
+    if rss_before is not None and rss_connected is not None:
+        rss_per_conn = round((rss_connected - rss_before) / connections)
+
+    return {
+        "at": time.time(),
+        "url": args.url or "in-process",
+        "python": sys.version.split()[0],
+        "config": {
+            "controllers": args.controllers,
+            "lifts": args.lifts,
+            "clients": args.clients,
+            "movers": args.movers,
+            "rate_hz": args.rate,
+            "seconds": args.seconds,
+            "env": {k: v for k, v in os.environ.items() if k.startswith("SMARTLIFT_")},
+        },
+        "command_latency": summarize(stats.command),
+        "broadcast_latency": summarize(stats.broadcast),
+        "estop_latency": summarize(stats.stop),
+        "throughput": {
+            "moves_per_s": round(stats.sent.get("move_lift", 0) / elapsed, 1),
+            "lift_moved_per_s": round(len(stats.broadcast) / elapsed, 1),
+            "sent": stats.sent,
+            "received": stats.received,
+        },
+        # in-process this includes the load generator's own sockets
+        "memory": {
+            "rss_before": rss_before,
+            "rss_connected": rss_connected,
+            "bytes_per_connection": rss_per_conn,
+        },
+        "errors": errors[:20],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="WebSocket base URL, e.g. ws://localhost:8000/api (default: in-process)")
+    parser.add_argument("--controllers", type=int, default=20)
+    parser.add_argument("--lifts", type=int, default=8)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--movers", type=int, default=20, help="clients that send move_lift")
+    parser.add_argument("--rate", type=float, default=10, help="move_lift per second and mover")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--out", help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    text = json.dumps(report, indent=2)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+
+    print(text)
@@ -0,0 +1,74 @@
+"""Inbound parser throughput per case, as seen during controller telemetry floods.
+
+    python -m benchmarks.parser [--seconds 0.5]
+
+"legacy" is the previous pipeline: json.loads, Case(), an if-chain into
+Model(**obj) and, for lift_moved, a second json.loads in the route.
+"""
+import argparse
+import json
+import time
+
+from app.models.messages import Case
+from app.utils import frames
+from app.utils.message_parser import MODELS, parse
+
+FRAMES = {
+    "lift_moved": '{"case":"lift_moved","lift_id":3,"direction":1,"toggle":1}',
+    "power_state": '{"case":"power_state","state":1}',
+    "hello": json.dumps(
+        {"case": "hello", "lifts": list(range(5)), "power_state": 1,
+         "version": "0.05.02", "ip": "10.0.0.12", "rssi": -61}
+    ),
+    "move_lift": json.dumps(
+        {"case": "move_lift", "client_id": "cli-1", "con_id": "con1",
+         "lift_id": 3, "toggle": 1, "direction": 0}
+    ),
+    "stop": '{"case":"stop"}',
+    "malformed": '{"lift_id": 3',
+}
+
+
+def legacy(raw: str):
+    try:
+        obj = json.loads(raw)
+        c = Case(obj["case"])
+    except Exception:
+        return None
+
+    msg = MODELS[c](**obj)
+
+    if c is Case.LIFT_MOVED:
+        json.loads(raw)
+
+    return msg
+
+
+def rate(fn, raw: str, seconds: float) -> float:
+    n = 0
+    end = time.perf_counter() + seconds
+    start = time.perf_counter()
+
+    while time.perf_counter() < end:
+        for _ in range(1000):
+            fn(raw)
+        n += 1000
+
+    return n / (time.perf_counter() - start)
+
+
+def main(seconds: float) -> None:
+    backend = "orjson" if frames.orjson is not None else "json"
+    print(f"JSON backend: {backend}\n")
+    print(f"{'case':<14}{'legacy msg/s':>14}{'parse msg/s':>14}{'speedup':>9}")
+
+    for name, raw in FRAMES.items():
+        old = rate(legacy, raw, seconds)
+        new = rate(parse, raw, seconds)
+        print(f"{name:<14}{old:>14,.0f}{new:>14,.0f}{new / old:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=0.5)
+    main(parser.parse_args().seconds)
@@ -0,0 +1,49 @@
+"""JSON vs the compact binary controller protocol (smartlift.bin.v1).
+
+    python -m benchmarks.wire [--seconds 0.5]
+
+Compares frame size and decode throughput for the messages a controller
+sends most, plus the encode cost of the backend's move_lift.
+"""
+import argparse
+import json
+
+from app.utils import binary_protocol, frames
+from app.utils.frames import Frame
+from app.utils.message_parser import parse
+
+from benchmarks.parser import rate
+
+INBOUND = {
+    "lift_moved": {"case": "lift_moved", "lift_id": 3, "direction": 1, "toggle": 1, "cmd_id": 1234},
+    "power_state": {"case": "power_state", "state": 1},
+    "hello (40)": {"case": "hello", "lifts": list(range(40)), "power_state": 1},
+}
+
+MOVE = {"case": "move_lift", "lift_id": 3, "direction": 1, "toggle": 1, "cmd_id": 1234}
+
+
+def main(seconds: float) -> None:
+    print(f"{'case':<14}{'json B':>8}{'bin B':>7}{'json msg/s':>13}{'bin msg/s':>13}{'speedup':>9}")
+
+    for name, obj in INBOUND.items():
+        text = json.dumps(obj, separators=(",", ":"))
+        raw = binary_protocol.encode_controller(obj)
+
+        old = rate(parse, text, seconds)
+        new = rate(binary_protocol.decode, raw, seconds)
+        print(f"{name:<14}{len(text):>8}{len(raw):>7}{old:>13,.0f}{new:>13,.0f}{new / old:>8.2f}x")
+
+    # outbound: Frame.of packs the binary form next to the JSON one, so
+    # this is the extra cost per move_lift against the JSON encoding
+    text = len(Frame.of(MOVE).text)
+    raw = len(Frame.of(MOVE).binary)
+    old = rate(frames.dumps, MOVE, seconds)
+    new = rate(binary_protocol.encode, MOVE, seconds)
+    print(f"{'move_lift out':<14}{text:>8}{raw:>7}{old:>13,.0f}{new:>13,.0f}{new / old:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=0.5)
+    main(parser.parse_args().seconds)
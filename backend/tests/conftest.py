@@ -0,0 +1,47 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+from app.managers.connection_manager import ConnectionManager
+from app.managers.lift_manager import LiftManager
+from app.managers.lift_registry import LiftRegistry
+
+
+class FakeSocket:
+    """WebSocket stand-in that keeps every frame; a `stuck` one never finishes a send."""
+
+    def __init__(self, stuck: bool = False) -> None:
+        self.stuck = stuck
+        self.frames: List[Dict[str, Any]] = []
+        self.closed = False
+
+    async def accept(self, subprotocol=None) -> None:
+        pass
+
+    async def close(self) -> None:
+        self.closed = True
+
+    async def send_text(self, text: str) -> None:
+        if self.stuck:
+            await asyncio.Event().wait()
+
+        self.frames.append(json.loads(text))
+
+    def cases(self, case: str) -> List[Dict[str, Any]]:
+        return [frame for frame in self.frames if frame.get("case") == case]
+
+
+@pytest.fixture
+def make_lm(tmp_path):
+    """LiftManagers whose lift_info.json lives in a temporary directory."""
+    made = []
+
+    def make(cm=None, bus=None) -> LiftManager:
+        lm = LiftManager(cm or ConnectionManager(), bus)
+        lm.registry = LiftRegistry(tmp_path / f"lift_info{len(made)}.json", 0)
+        made.append(lm)
+        return lm
+
+    return make
@@ -0,0 +1,40 @@
+import pytest
+
+from app.models.messages import Case, ErrorMsg, HelloMsg, LiftMovedMsg, PowerStateMsg, StopMsg
+from app.utils import binary_protocol
+from app.utils.frames import Frame
+
+
+@pytest.mark.parametrize(
+    "obj, model",
+    [
+        ({"case": "lift_moved", "lift_id": 3, "direction": None, "toggle": 1, "cmd_id": 7}, LiftMovedMsg),
+        ({"case": "power_state", "state": 0}, PowerStateMsg),
+        ({"case": "hello", "lifts": [0, 1, 2], "power_state": 1}, HelloMsg),
+        ({"case": "stop"}, StopMsg),
+    ],
+)
+def test_controller_frames_round_trip(obj, model):
+    msg, decoded = binary_protocol.decode(binary_protocol.encode_controller(obj))
+
+    assert type(msg) is model
+    assert decoded == obj
+
+
+def test_out_of_range_values_are_rejected():
+    msg, _ = binary_protocol.decode(binary_protocol.encode_controller({"case": "power_state", "state": 2}))
+    assert isinstance(msg, ErrorMsg)
+
+    msg, _ = binary_protocol.decode(bytes((binary_protocol.HELLO, 1, 3, 0)))
+    assert isinstance(msg, ErrorMsg)
+
+
+def test_frames_carry_their_binary_form():
+    move = {"case": Case.MOVE_LIFT, "lift_id": 3, "direction": 2, "toggle": 1, "cmd_id": 9}
+
+    assert Frame.of(move).binary == binary_protocol.encode(move)
+    assert Frame.of({"case": Case.STOP}).binary == bytes((binary_protocol.STOP,))
+
+    # client messages and lifts outside the layout fall back to JSON text
+    assert Frame.of({"case": Case.POWER_STATES, "states": {}}).binary is None
+    assert Frame.of({**move, "lift_id": 70000}).binary is None
@@ -0,0 +1,97 @@
+import asyncio
+
+from app.core import config
+from app.managers.command_tracker import CommandTracker
+from app.models.messages import Case, HelloMsg, MoveLiftMsg
+
+from conftest import FakeSocket
+
+
+def test_ack_ignores_another_controllers_command():
+    async def main():
+        failed = []
+
+        async def on_failed(cmd, reason):
+            failed.append((cmd.cmd_id, reason))
+
+        tracker = CommandTracker(0.02, on_failed)
+        tracker.issue(1, "con1", 0, 1, 1, "cli1")
+
+        assert tracker.ack("con2", {"cmd_id": 1, "lift_id": 0}) is None
+        assert len(tracker) == 1
+
+        # still pending, so it times out instead of vanishing
+        await asyncio.sleep(0.05)
+        assert failed == [(1, "timeout")]
+
+    asyncio.run(main())
+
+
+def test_ack_resolves_own_command():
+    async def main():
+        async def on_failed(cmd, reason):
+            raise AssertionError(reason)
+
+        tracker = CommandTracker(1, on_failed)
+        tracker.issue(1, "con1", 0, 1, 1, "cli1")
+
+        assert tracker.ack("con1", {"cmd_id": 1, "lift_id": 0}) is not None
+        assert len(tracker) == 0
+
+    asyncio.run(main())
+
+
+def test_lift_moved_reaches_clients_without_backend_cmd_id(make_lm, monkeypatch):
+    monkeypatch.setattr(config, "LIFT_MOVED_RATE_HZ", 0)
+
+    async def main():
+        lm = make_lm()
+        controller, client = FakeSocket(), FakeSocket()
+
+        await lm.cm.connect("con1", controller)
+        await lm.cm.connect("cli1", client)
+        await lm.recv_hello("con1", HelloMsg(case=Case.HELLO, lifts=[0]))
+
+        await lm.send_move_lift(
+            MoveLiftMsg(
+                case=Case.MOVE_LIFT,
+                client_id="cli1",
+                con_id="con1",
+                lift_id=0,
+                toggle=1,
+                direction=1,
+                cmd_id=42,
+            )
+        )
+        await asyncio.sleep(0.01)
+
+        [sent] = controller.cases(Case.MOVE_LIFT)
+        reply = {"lift_id": 0, "direction": 1, "toggle": 1, "cmd_id": sent["cmd_id"]}
+        await lm.send_lift_moved_raw(reply, "con1")
+        await asyncio.sleep(0.01)
+
+        [moved] = client.cases(Case.LIFT_MOVED)
+        assert "cmd_id" not in moved
+        assert len(lm.commands) == 0
+
+    asyncio.run(main())
+
+
+def test_undelivered_move_does_not_take_the_lift(make_lm):
+    async def main():
+        lm = make_lm()
+        client = FakeSocket()
+
+        # routed to this worker, but the controller's socket is gone
+        await lm.cm.connect("cli1", client)
+        await lm.recv_hello("con1", HelloMsg(case=Case.HELLO, lifts=[0]))
+
+        await lm.send_move_lift(
+            MoveLiftMsg(case=Case.MOVE_LIFT, client_id="cli1", con_id="con1", lift_id=0, toggle=1, direction=1)
+        )
+        await asyncio.sleep(0.01)
+
+        assert [f["reason"] for f in client.cases(Case.MOVE_FAILED)] == ["offline"]
+        assert lm.active_lifts == {}
+
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+import asyncio
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from app.managers.event_store import EventStore
+
+
+def test_failed_batch_does_not_block_later_writes(tmp_path):
+    async def main():
+        store = EventStore(tmp_path / "events.db", flush_interval=60)
+        await store.start()
+
+        # one bad row fails the whole batch
+        with pytest.raises(sqlite3.Error):
+            await asyncio.to_thread(store._write, [(0.0, "lost", "con1", 0, "cli1", None), (1.0,)])
+
+        store.record("move", con_id="con1", lift_id=0, client_id="cli1")
+        await store.flush()
+
+        # what another reader sees, i.e. what was committed
+        with closing(sqlite3.connect(tmp_path / "events.db")) as db:
+            assert db.execute("SELECT kind FROM events").fetchall() == [("move",)]
+
+        await store.stop()
+
+    asyncio.run(main())
+
+
+def test_stop_writes_pending_events(tmp_path):
+    async def main():
+        store = EventStore(tmp_path / "events.db", flush_interval=60)
+        await store.start()
+        store.record("estop", controllers=2)
+        await store.stop()
+
+        store = EventStore(tmp_path / "events.db")
+        await store.start()
+        [event] = await store.query()
+        assert (event["kind"], event["controllers"]) == ("estop", 2)
+        await store.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+import asyncio
+
+from app.core import config
+from app.managers.connection_manager import ConnectionManager, SlowConsumerPolicy
+from app.models.messages import Case, HelloMsg, MoveLiftMsg
+from app.utils.frames import Frame
+
+from conftest import FakeSocket
+
+
+def move(client_id: str, con_id: str, lift_id: int, toggle: int = 1) -> MoveLiftMsg:
+    return MoveLiftMsg(
+        case=Case.MOVE_LIFT,
+        client_id=client_id,
+        con_id=con_id,
+        lift_id=lift_id,
+        toggle=toggle,
+        direction=1,
+        cmd_id=7,
+    )
+
+
+def test_estop_deadline_miss_takes_controller_offline(make_lm, monkeypatch):
+    monkeypatch.setattr(config, "ESTOP_DEADLINE_MS", 20)
+
+    async def main():
+        lm = make_lm()
+        stuck, client = FakeSocket(stuck=True), FakeSocket()
+
+        await lm.cm.connect("con1", stuck)
+        await lm.cm.connect("cli1", client)
+        await lm.recv_hello("con1", HelloMsg(case=Case.HELLO, lifts=[0, 1]))
+
+        await lm.e_stop()
+
+        assert stuck.closed
+        assert lm.last_stop["send_ms"] == {"con1": None}
+        assert "con1" not in lm.online_lifts
+
+        # its lifts lost their route, so moves are refused right away
+        await lm.send_move_lift(move("cli1", "con1", 0))
+        await asyncio.sleep(0.01)
+
+        assert [f["reason"] for f in client.cases(Case.MOVE_FAILED)] == ["offline"]
+        assert client.cases(Case.LIFTS_REMOVED)[-1]["offline"] is True
+
+    asyncio.run(main())
+
+
+def test_evicted_slow_client_releases_its_lift(make_lm):
+    async def main():
+        cm = ConnectionManager(queue_size=2, policy=SlowConsumerPolicy.DISCONNECT)
+        lm = make_lm(cm)
+        controller, slow, other = FakeSocket(), FakeSocket(stuck=True), FakeSocket()
+
+        await cm.connect("con1", controller)
+        await cm.connect("cli1", slow)
+        await cm.connect("cli2", other)
+        await lm.recv_hello("con1", HelloMsg(case=Case.HELLO, lifts=[0]))
+
+        await lm.send_move_lift(move("cli1", "con1", 0))
+        assert lm.active_lifts == {"cli1": 0}
+
+        # cli2 keeps up, cli1 is stuck on its first frame
+        for _ in range(4):
+            await cm.broadcast_clients(Frame.of({"case": Case.POWER_STATES, "states": {}}))
+            await asyncio.sleep(0.01)
+
+        assert slow.closed
+        assert lm.active_lifts == {}
+        assert controller.cases(Case.STOP)
+        assert [f["client_id"] for f in other.cases(Case.CLIENT_DISCONNECT)] == ["cli1"]
+
+    asyncio.run(main())
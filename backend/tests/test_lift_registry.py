@@ -0,0 +1,41 @@
+import asyncio
+import json
+
+from app.managers import lift_registry
+from app.managers.lift_registry import LiftRegistry
+
+
+def test_failed_write_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(lift_registry, "WRITE_RETRY", 0.02)
+    target = tmp_path / "missing" / "lift_info.json"
+
+    async def main():
+        registry = LiftRegistry(target, 0)
+        registry.bind("con1", 0)
+        await asyncio.sleep(0.01)
+
+        # the directory does not exist yet, so the first write failed
+        assert not target.exists()
+
+        target.parent.mkdir()
+        await asyncio.sleep(0.05)
+
+        assert json.loads(target.read_text())["lifts"]["0"]["con_id"] == "con1"
+
+    asyncio.run(main())
+
+
+def test_flush_retries_a_failed_write(tmp_path):
+    target = tmp_path / "missing" / "lift_info.json"
+
+    async def main():
+        registry = LiftRegistry(target, 0)
+        registry.set_names({0: "Bay 1"})
+        await asyncio.sleep(0.01)
+
+        target.parent.mkdir()
+        await registry.flush()
+
+        assert json.loads(target.read_text())["lifts"]["0"]["name"] == "Bay 1"
+
+    asyncio.run(main())
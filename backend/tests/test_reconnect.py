@@ -0,0 +1,52 @@
+import asyncio
+
+from app.core import config
+from app.models.messages import Case, HelloMsg
+
+from conftest import FakeSocket
+
+DELTAS = (Case.LIFTS_ADDED, Case.LIFTS_REMOVED, Case.LIFT_RENAMED)
+
+
+def deltas(sock: FakeSocket):
+    return [frame for frame in sock.frames if frame.get("case") in DELTAS]
+
+
+def test_reconnect_within_grace_is_invisible(make_lm, monkeypatch):
+    monkeypatch.setattr(config, "RECONNECT_GRACE", 5)
+
+    async def main():
+        lm = make_lm()
+        client = FakeSocket()
+        await lm.cm.connect("cli1", client)
+
+        await lm.recv_hello("con1", HelloMsg(case=Case.HELLO, lifts=[0, 1]))
+        await lm.controller_disconnected("con1")
+        await lm.recv_hello("con1", HelloMsg(case=Case.HELLO, lifts=[0, 1]))
+        await asyncio.sleep(0.01)
+
+        assert len(deltas(client)) == 1
+
+    asyncio.run(main())
+
+
+def test_changed_lift_set_is_one_delta(make_lm, monkeypatch):
+    monkeypatch.setattr(config, "RECONNECT_GRACE", 5)
+
+    async def main():
+        lm = make_lm()
+        client = FakeSocket()
+        await lm.cm.connect("cli1", client)
+
+        await lm.recv_hello("con1", HelloMsg(case=Case.HELLO, lifts=[0, 1]))
+        await lm.controller_disconnected("con1")
+        await lm.recv_hello("con1", HelloMsg(case=Case.HELLO, lifts=[1, 2]))
+        await asyncio.sleep(0.01)
+
+        first, update = deltas(client)
+        assert update["case"] == Case.LIFTS_ADDED
+        assert (list(update["lifts"]), update["removed"]) == (["2"], [0])
+        assert update["seq"] == first["seq"] + 1
+        assert set(lm.online_lifts["con1"]) == {1, 2}
+
+    asyncio.run(main())
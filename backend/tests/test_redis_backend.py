@@ -0,0 +1,67 @@
+import asyncio
+
+import fakeredis
+
+from app.backends.redis_backend import RedisBackend
+from app.managers.connection_manager import ConnectionManager
+from app.models.messages import Case, HelloMsg, MoveLiftMsg
+
+from conftest import FakeSocket
+
+
+async def settle() -> None:
+    # pub/sub delivery and the writers both need a few loop turns
+    await asyncio.sleep(0.05)
+
+
+def test_move_is_routed_to_the_worker_holding_the_controller(make_lm):
+    async def main():
+        server = fakeredis.FakeServer()
+        a = make_lm(ConnectionManager(), RedisBackend(fakeredis.FakeAsyncRedis(server=server)))
+        b = make_lm(ConnectionManager(), RedisBackend(fakeredis.FakeAsyncRedis(server=server)))
+        await a.start()
+        await b.start()
+
+        controller, client = FakeSocket(), FakeSocket()
+        await a.cm.connect("con1", controller)
+        await b.cm.connect("cli1", client)
+
+        await a.recv_hello("con1", HelloMsg(case=Case.HELLO, lifts=[0, 1]))
+        await settle()
+
+        assert set(b.online_lifts["con1"]) == {0, 1}
+        assert client.cases(Case.LIFTS_ADDED)[-1]["con_id"] == "con1"
+
+        await b.send_move_lift(
+            MoveLiftMsg(
+                case=Case.MOVE_LIFT, client_id="cli1", con_id="con1", lift_id=1, toggle=1, direction=1
+            )
+        )
+        await settle()
+
+        [moved] = controller.cases(Case.MOVE_LIFT)
+        assert (moved["client_id"], moved["lift_id"], moved["toggle"]) == ("cli1", 1, 1)
+
+        await a.stop()
+        await b.stop()
+
+    asyncio.run(main())
+
+
+def test_late_worker_loads_controller_state(make_lm):
+    async def main():
+        server = fakeredis.FakeServer()
+        a = make_lm(ConnectionManager(), RedisBackend(fakeredis.FakeAsyncRedis(server=server)))
+        await a.start()
+        await a.recv_hello("con1", HelloMsg(case=Case.HELLO, lifts=[0], power_state=1))
+
+        b = make_lm(ConnectionManager(), RedisBackend(fakeredis.FakeAsyncRedis(server=server)))
+        await b.start()
+
+        assert set(b.online_lifts["con1"]) == {0}
+        assert b.lift_power == {"con1": 1}
+
+        await a.stop()
+        await b.stop()
+
+    asyncio.run(main())
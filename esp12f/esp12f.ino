@@ -250,7 +250,13 @@ void webSocketEvent(WStype_t type, uint8_t *payload, size_t len) {
       if (id<lift_begin || id>=lift_begin+lift_count || dir<0||dir>2 || (t!=0 && t!=1)) return;
       uint8_t r = lifts[id-lift_begin][dir];
       hc595Write(r, t==1);
-      StaticJsonDocument<128> rj; rj["case"]="lift_moved"; rj["lift_id"]=id; rj["direction"]=dir; rj["toggle"]=t; sendMessage(rj);
+      StaticJsonDocument<128> rj; rj["case"]="lift_moved"; rj["lift_id"]=id; rj["direction"]=dir; rj["toggle"]=t;
+      if (!d["cmd_id"].isNull()) rj["cmd_id"]=d["cmd_id"];  // lets the backend match the reply
+      sendMessage(rj);
+    }
+
+    if (c == "ping") {
+      StaticJsonDocument<32> rj; rj["case"]="pong"; sendMessage(rj);
     }
 
     if (c == "stop") {
@@ -10,10 +10,26 @@ let reconnectDelay = 1000
 const maxReconnectDelay = 10000
 
 export const powerStates = ref({})
+export const onlineLifts = ref({})
+
+// Sequence number of the last applied online-lifts message, null until the
+// first snapshot arrived.
+let liftsSeq = null
 
 const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws'
 const url = `${protocol}://${window.location.host}/api/ws/${clientId}`
 
+// Lets the backend send several queued messages as one JSON array
+const BATCH_SUBPROTOCOL = 'smartlift.batch.v1'
+
+// Session to resume after a short drop, and how many of its messages were
+// processed; the backend replays the rest instead of sending snapshots
+let sessionToken = ''
+let received = 0
+
+// Controllers and lifts this page watches (see subscribe), null for all
+let topics = null
+
 function connect() {
   if (
     ws.value &&
@@ -25,7 +41,10 @@ function connect() {
 
   console.log('[WS] Connecting...')
 
-  const socket = new WebSocket(url)
+  const socket = new WebSocket(
+    `${url}?session=${encodeURIComponent(sessionToken)}&ack=${received}`,
+    [BATCH_SUBPROTOCOL]
+  )
   ws.value = socket
 
   socket.onopen = () => {
@@ -33,28 +52,30 @@ function connect() {
 
     reconnectDelay = 1000
     clearTimeout(reconnectTimer)
+
+    // a new connection watches everything again
+    if (topics) send({ case: 'subscribe', ...topics })
   }
 
   socket.onmessage = (event) => {
-    try {
-      const data = JSON.parse(event.data)
-
-      if (data.case === 'power_states') {
-        powerStates.value = { ...data.states }
-      }
-
-      else if (data.case === 'power_state' && data.con_id) {
-        powerStates.value = {
-          ...powerStates.value,
-          [data.con_id]: Number(data.state) ? 1 : 0
-        }
-      }
-
-      listeners.forEach(cb => cb(data))
+    let data
 
+    try {
+      data = JSON.parse(event.data)
     } catch (err) {
       console.error('[WS] Invalid JSON:', event.data)
+      return
+    }
+
+    if (data.case === 'session') {
+      if (!data.resumed) received = 0
+      sessionToken = data.token
+      return
     }
+
+    const messages = Array.isArray(data) ? data : [data]
+    received += messages.length
+    messages.forEach(handleMessage)
   }
 
   socket.onclose = () => {
@@ -67,6 +88,78 @@ function connect() {
   }
 }
 
+const LIFT_DELTAS = new Set(['lifts_added', 'lifts_removed', 'lift_renamed'])
+
+function handleMessage(data) {
+  if (data.case === 'power_states') {
+    powerStates.value = { ...data.states }
+  }
+
+  else if (data.case === 'power_state' && data.con_id) {
+    powerStates.value = {
+      ...powerStates.value,
+      [data.con_id]: Number(data.state) ? 1 : 0
+    }
+  }
+
+  else if (data.case === 'online_lifts') {
+    onlineLifts.value = data.lifts
+    liftsSeq = data.seq ?? null
+  }
+
+  else if (LIFT_DELTAS.has(data.case)) {
+    applyLiftsDelta(data)
+  }
+
+  else if (data.case === 'move_failed') {
+    console.warn(`[WS] Lift ${data.lift_id} on ${data.con_id} did not confirm the move (${data.reason})`)
+  }
+
+  listeners.forEach(cb => {
+    try {
+      cb(data)
+    } catch (err) {
+      console.error('[WS] Listener failed:', err)
+    }
+  })
+}
+
+function applyLiftsDelta(data) {
+  // Deltas before the first snapshot or already covered by it are stale
+  if (liftsSeq === null || data.seq <= liftsSeq) return
+
+  if (data.seq !== liftsSeq + 1) {
+    console.warn(`[WS] Lifts seq gap (${liftsSeq} -> ${data.seq}), resyncing`)
+    liftsSeq = null
+    send({ case: 'get_online_lifts' })
+    return
+  }
+
+  liftsSeq = data.seq
+  const lifts = { ...onlineLifts.value }
+  const group = { ...(lifts[data.con_id] || {}) }
+
+  if (data.case === 'lifts_added') {
+    (data.removed || []).forEach(id => delete group[id])
+    Object.assign(group, data.lifts)
+    lifts[data.con_id] = group
+  }
+
+  else if (data.case === 'lifts_removed') {
+    data.lift_ids.forEach(id => delete group[id])
+
+    if (data.offline) delete lifts[data.con_id]
+    else lifts[data.con_id] = group
+  }
+
+  else if (data.case === 'lift_renamed' && group[data.lift_id]) {
+    group[data.lift_id] = { ...group[data.lift_id], name: data.name }
+    lifts[data.con_id] = group
+  }
+
+  onlineLifts.value = lifts
+}
+
 function scheduleReconnect() {
   if (reconnectTimer) return
 
@@ -100,6 +193,14 @@ function emergencyStop() {
   send({ case: 'stop' })
 }
 
+// Only receive lift_moved and power_state for these controllers
+// (['con1']) and lifts ([{ con_id: 'con2', lift_id: 0 }]); no arguments
+// receive everything again.
+function subscribe({ controllers = [], lifts = [] } = {}) {
+  topics = controllers.length || lifts.length ? { controllers, lifts } : null
+  send({ case: 'subscribe', controllers, lifts })
+}
+
 function onMessage(cb) {
   listeners.add(cb)
 
@@ -119,6 +220,7 @@ window.addEventListener('focus', startup)
 export default () => ({
   send,
   emergencyStop,
+  subscribe,
   onMessage,
   startup
 })
\ No newline at end of file